@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, String, Float, Integer, Date, Enum, ForeignKey
+from sqlalchemy import create_engine, Column, String, Float, Integer, Date, Enum, ForeignKey, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import enum
@@ -100,8 +100,18 @@ class TimeReport(Base):
     hours = Column(Float, nullable=False)
     effort_percentage = Column(Float, nullable=False)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Tables are created from the app's lifespan, not at import. PRAGMA
+# user_version records the schema version, so an up-to-date database costs
+# one query at startup instead of create_all's per-table reflection.
+SCHEMA_VERSION = 1
+
+def ensure_schema():
+    with engine.connect() as connection:
+        if connection.execute(text("PRAGMA user_version")).scalar() >= SCHEMA_VERSION:
+            return
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
 
 def get_db():
     db = SessionLocal()
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, HTTPException, Depends
+import enum
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from fastapi import FastAPI, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
 from models import (
     User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport,
-    Role, ShipmentStatus, ScheduleStatusEnum
+    ShipmentStatus, ScheduleStatusEnum
 )
 from database import (
     User as UserModel, Crew as CrewModel, Project as ProjectModel, PerformanceMetric as MetricModel,
@@ -13,14 +18,52 @@ from database import (
 )
 
 import database
-
-app = FastAPI(title="Construction Management System API", description="API for managing construction project data")
+from role_cache import roles, check_foreman
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.ensure_schema()
+    yield
+
+app = FastAPI(title="Construction Management System API", description="API for managing construction project data", lifespan=lifespan)
+
+# Fast list responses (CMS_FAST_JSON=1): list routes fetch plain column rows
+# and encode them straight to JSON bytes, skipping the ORM objects and
+# FastAPI's per-item validation against response_model, which still
+# documents the route. Uses orjson when installed, otherwise json.
+fast_json = os.environ.get("CMS_FAST_JSON") == "1"
+
+try:
+    import orjson
+
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+except ImportError:
+    def json_default(value):
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, enum.Enum):
+            return value.value
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def list_response(query):
+    if not fast_json:
+        return query.all()
+    model = query.column_descriptions[0]["entity"]
+    rows = query.with_entities(*model.__table__.columns).all()
+    return Response(dumps([row._asdict() for row in rows]), media_type="application/json")
 
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "OK", "message": "API is running"}
 
+def role_loader(db: Session):
+    return lambda user_id: db.query(UserModel.role).filter(UserModel.user_id == user_id).scalar()
+
 # CRUD for User
 @app.post("/users/", response_model=User)
 async def create_user(user: User, db: Session = Depends(get_db)):
@@ -28,11 +71,12 @@ async def create_user(user: User, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    roles.invalidate(user.user_id)
     return user
 
 @app.get("/users/", response_model=List[User])
 async def read_users(db: Session = Depends(get_db)):
-    return db.query(UserModel).all()
+    return list_response(db.query(UserModel))
 
 @app.get("/users/{user_id}", response_model=User)
 async def read_user(user_id: UUID, db: Session = Depends(get_db)):
@@ -51,6 +95,7 @@ async def update_user(user_id: UUID, updated_user: User, db: Session = Depends(g
     user.role = updated_user.role.value
     db.commit()
     db.refresh(user)
+    roles.invalidate(user_id, updated_user.user_id)
     return updated_user
 
 @app.delete("/users/{user_id}")
@@ -60,6 +105,7 @@ async def delete_user(user_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    roles.invalidate(user_id)
     return {"detail": "User deleted"}
 
 # CRUD for Crew
@@ -76,7 +122,7 @@ async def read_crews(project_id: UUID = None, db: Session = Depends(get_db)):
     query = db.query(CrewModel)
     if project_id:
         query = query.filter(CrewModel.project_id == str(project_id))
-    return query.all()
+    return list_response(query)
 
 @app.get("/crews/{crew_id}", response_model=Crew)
 async def read_crew(crew_id: UUID, db: Session = Depends(get_db)):
@@ -117,7 +163,7 @@ async def create_project(project: Project, db: Session = Depends(get_db)):
 
 @app.get("/projects/", response_model=List[Project])
 async def read_projects(db: Session = Depends(get_db)):
-    return db.query(ProjectModel).all()
+    return list_response(db.query(ProjectModel))
 
 @app.get("/projects/{project_id}", response_model=Project)
 async def read_project(project_id: UUID, db: Session = Depends(get_db)):
@@ -163,8 +209,7 @@ async def create_metric(metric: PerformanceMetric, db: Session = Depends(get_db)
 
 @app.get("/metrics/", response_model=List[PerformanceMetric])
 async def read_metrics(crew_id: UUID, db: Session = Depends(get_db)):
-    metrics = db.query(MetricModel).filter(MetricModel.crew_id == str(crew_id)).all()
-    return metrics
+    return list_response(db.query(MetricModel).filter(MetricModel.crew_id == str(crew_id)))
 
 @app.get("/metrics/{metric_id}", response_model=PerformanceMetric)
 async def read_metric(metric_id: UUID, db: Session = Depends(get_db)):
@@ -213,8 +258,7 @@ async def create_activity(activity: Activity, db: Session = Depends(get_db)):
 
 @app.get("/activities/", response_model=List[Activity])
 async def read_activities(project_id: UUID, db: Session = Depends(get_db)):
-    activities = db.query(ActivityModel).filter(ActivityModel.project_id == str(project_id)).all()
-    return activities
+    return list_response(db.query(ActivityModel).filter(ActivityModel.project_id == str(project_id)))
 
 @app.get("/activities/{activity_id}", response_model=Activity)
 async def read_activity(activity_id: UUID, db: Session = Depends(get_db)):
@@ -263,8 +307,7 @@ async def create_shipment(shipment: Shipment, db: Session = Depends(get_db)):
 
 @app.get("/shipments/", response_model=List[Shipment])
 async def read_shipments(project_id: UUID, db: Session = Depends(get_db)):
-    shipments = db.query(ShipmentModel).filter(ShipmentModel.project_id == str(project_id)).all()
-    return shipments
+    return list_response(db.query(ShipmentModel).filter(ShipmentModel.project_id == str(project_id)))
 
 @app.get("/shipments/{shipment_id}", response_model=Shipment)
 async def read_shipment(shipment_id: UUID, db: Session = Depends(get_db)):
@@ -314,8 +357,7 @@ async def create_status(status: ScheduleStatus, db: Session = Depends(get_db)):
 
 @app.get("/statuses/", response_model=List[ScheduleStatus])
 async def read_statuses(project_id: UUID, db: Session = Depends(get_db)):
-    statuses = db.query(StatusModel).filter(StatusModel.project_id == str(project_id)).all()
-    return statuses
+    return list_response(db.query(StatusModel).filter(StatusModel.project_id == str(project_id)))
 
 @app.get("/statuses/{status_id}", response_model=ScheduleStatus)
 async def read_status(status_id: UUID, db: Session = Depends(get_db)):
@@ -350,9 +392,7 @@ async def delete_status(status_id: UUID, db: Session = Depends(get_db)):
 # CRUD for TimeReport
 @app.post("/reports/", response_model=TimeReport)
 async def create_report(report: TimeReport, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.user_id == str(report.user_id)).first()
-    if not user or user.role != Role.FOREMAN.value:
-        raise HTTPException(status_code=403, detail="Only Foremen can submit time reports")
+    check_foreman(report.user_id, role_loader(db), "submit")
     db_report = ReportModel(
         report_id=str(report.report_id), crew_id=str(report.crew_id), user_id=str(report.user_id),
         date=report.date, member_name=report.member_name, task=report.task,
@@ -365,8 +405,7 @@ async def create_report(report: TimeReport, db: Session = Depends(get_db)):
 
 @app.get("/reports/", response_model=List[TimeReport])
 async def read_reports(crew_id: UUID, db: Session = Depends(get_db)):
-    reports = db.query(ReportModel).filter(ReportModel.crew_id == str(crew_id)).all()
-    return reports
+    return list_response(db.query(ReportModel).filter(ReportModel.crew_id == str(crew_id)))
 
 @app.get("/reports/{report_id}", response_model=TimeReport)
 async def read_report(report_id: UUID, db: Session = Depends(get_db)):
@@ -380,9 +419,7 @@ async def update_report(report_id: UUID, updated_report: TimeReport, db: Session
     report = db.query(ReportModel).filter(ReportModel.report_id == str(report_id)).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
-    user = db.query(UserModel).filter(UserModel.user_id == str(updated_report.user_id)).first()
-    if not user or user.role != Role.FOREMAN.value:
-        raise HTTPException(status_code=403, detail="Only Foremen can update time reports")
+    check_foreman(updated_report.user_id, role_loader(db), "update")
     report.report_id = str(updated_report.report_id)
     report.crew_id = str(updated_report.crew_id)
     report.user_id = str(updated_report.user_id)
@@ -0,0 +1,68 @@
+import threading
+import time
+from uuid import UUID
+from models import Role
+from fastapi import HTTPException
+
+# Process-wide cache of user roles for the Foreman check in the time report
+# routes (create_report and update_report in main.py), so submitting a report
+# does not query the user each time. Entries expire after ROLE_TTL_SECONDS,
+# which bounds how long a change made by another worker can go unnoticed; the
+# user routes in main.py invalidate a user's entry whenever they write it.
+ROLE_TTL_SECONDS = 60.0
+
+MISSING = object()
+
+def role_value(role):
+    # The query returns a database.Role, the API models a models.Role;
+    # compare them by value.
+    return getattr(role, "value", role)
+
+class RoleCache:
+    def __init__(self, ttl: float = ROLE_TTL_SECONDS):
+        self.ttl = ttl
+        self.entries = {}  # user_id -> (role value, or None for no such user; expiry)
+        # Bumped by every invalidation. A role loaded while it moved may
+        # predate the write that invalidated it, so it is not cached.
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, user_id: str):
+        entry = self.entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return MISSING
+        return entry[0]
+
+    def put(self, user_id: str, role, generation: int) -> None:
+        with self.lock:
+            if generation == self.generation:
+                self.entries[user_id] = (role_value(role), time.monotonic() + self.ttl)
+
+    def lookup(self, user_id: str, load):
+        role = self.get(user_id)
+        if role is MISSING:
+            generation = self.generation
+            role = role_value(load(user_id))
+            self.put(user_id, role, generation)
+        return role
+
+    def invalidate(self, *user_ids) -> None:
+        with self.lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self.entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+roles = RoleCache()
+
+def require_foreman(role, action: str) -> None:
+    if role_value(role) != Role.FOREMAN.value:
+        raise HTTPException(status_code=403, detail=f"Only Foremen can {action} time reports")
+
+def check_foreman(user_id: UUID, load, action: str) -> None:
+    # load(user_id as str) returns the user's role, or None if there is no such user.
+    require_foreman(roles.lookup(str(user_id), load), action)
@@ -0,0 +1,43 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold start of one API worker: a fresh interpreter imports main and runs the
+# app's lifespan startup and shutdown, which is what each uvicorn worker pays
+# before serving its first request. Reported for the backend CMS_REPOTYPE
+# selects; each run is a separate process so no import is ever cached.
+# Run from cms_api/: CMS_REPOTYPE=MEM python -m benchmarks.cold_start
+
+BOOT = """
+import asyncio
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+async def boot():
+    async with main.lifespan(main.app):
+        print(imported - start, time.perf_counter() - imported)
+asyncio.run(boot())
+"""
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    totals, imports, startups = [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", BOOT], check=True, capture_output=True, text=True).stdout
+        totals.append(time.perf_counter() - start)
+        imported, started = map(float, output.split())
+        imports.append(imported)
+        startups.append(started)
+    print(f"{args.runs} cold starts")
+    for name, samples in [("process", totals), ("import main", imports), ("lifespan", startups)]:
+        print(f"{name:>12}: median {statistics.median(samples) * 1000:7.1f} ms  min {min(samples) * 1000:7.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+from uuid import uuid4
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import Session
+from models import PerformanceMetric
+from database import create_sqlite_engine, ensure_schema
+from repositories.registry import repository_classes
+from main import encode_list
+
+# Encoding cost of one large listing, GET /metrics/?crew_id= for a crew with
+# --rows metrics, per backend: FastAPI's default path (validate against
+# response_model, then json.dumps) against the CMS_FAST_JSON path
+# (main.encode_list). The repository is read once; only encoding is timed,
+# and both encodings must produce the same bytes.
+# Run from cms_api/: python -m benchmarks.list_serialization
+
+BACKENDS = ["SQL", "CSV", "MEM", "PARQUET", "MMAP"]
+# Where each file-backed repository keeps its metrics, inside the scratch directory.
+PATHS = {"CSV": "metrics.csv", "PARQUET": "parquet/metrics", "MMAP": "metrics.bin"}
+
+response_field = create_model_field(name="Response", type_=List[PerformanceMetric], mode="serialization")
+
+def fastapi_encode(items: list) -> bytes:
+    content = asyncio.run(serialize_response(field=response_field, response_content=items, is_coroutine=True))
+    return JSONResponse(content).body
+
+def best_of(repeat: int, encode, items: list) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode(items)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+def load(backend: str, directory: str, rows: int) -> list:
+    crew_id = uuid4()
+    metrics = [PerformanceMetric(metric_id=uuid4(), crew_id=crew_id, date=date(2025, 1, 1) + timedelta(days=i % 365), productivity=i % 100 / 100, tasks_completed=i % 10, tasks_total=10, hours_worked=8.0) for i in range(rows)]
+    repository_class = repository_classes(backend)["metrics"]
+    if backend == "SQL":
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        ensure_schema(engine)
+        with Session(engine) as db:
+            repository = repository_class(db)
+            repository.create_many(metrics)
+            items = repository.get_all(crew_id)
+        engine.dispose()
+        return items
+    repository = repository_class(os.path.join(directory, PATHS[backend])) if backend in PATHS else repository_class()
+    repository.create_many(metrics)
+    return repository.get_all(crew_id)
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="default: all backends")
+    args = parser.parse_args()
+    print(f"{args.rows} metrics, best of {args.repeat}")
+    failed = False
+    for backend in args.backend or BACKENDS:
+        with tempfile.TemporaryDirectory(dir=".") as directory:
+            items = load(backend, directory, args.rows)
+        default_time, default_body = best_of(args.repeat, fastapi_encode, items)
+        fast_time, fast_body = best_of(args.repeat, encode_list, items)
+        same = "" if fast_body == default_body else "  OUTPUT DIFFERS"
+        failed |= bool(same)
+        print(f"{backend:>8}: response_model {default_time * 1000:7.1f} ms  fast {fast_time * 1000:7.1f} ms  ({default_time / fast_time:4.1f}x){same}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
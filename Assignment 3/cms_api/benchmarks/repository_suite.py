@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import csv
+import inspect
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from uuid import UUID
+from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport, Role, ShipmentStatus, ScheduleStatusEnum
+from repositories.registry import ENTITIES, repository_classes
+
+# The same workloads against every implementation of the repository ABCs in
+# repositories/base.py: a table of --rows rows is bulk inserted in --batch
+# sized create_many calls, then timed point reads (get_by_id), filtered lists
+# (one project's or crew's rows; a keyset page for users and projects),
+# single inserts, updates and deletes, --ops of each. Every backend, entity
+# and size runs in its own process in a scratch directory, so peak RSS (not
+# available on Windows) is that run's alone. Repositories are used as the API uses them: a new session per
+# operation for SQL and ASYNCSQL (included in the timing), one shared instance
+# otherwise. Sizes from 1k to 10M rows work; rows are generated a batch at a
+# time and ids are derived from row numbers, so the harness holds no table.
+# Results are one row per operation, as JSON or CSV.
+# Run from cms_api/:
+#   python -m benchmarks.repository_suite --rows 1000 --rows 100000 --format csv --output results.csv
+
+BACKENDS = ["SQL", "ASYNCSQL", "CSV", "MEM", "PARQUET", "MMAP"]
+FIELDS = ["backend", "entity", "rows", "operation", "count", "seconds", "per_second", "p50_ms", "p99_ms", "peak_rss_mb"]
+
+# Row ids are a fixed odd multiple of the row number modulo 2**128, a
+# bijection that scatters them over the key space like uuid4 does.
+SCATTER = 0x9E3779B97F4A7C15F39CC0605CEDC835
+PARENT_SALT = 1 << 100
+FOREMAN = UUID(int=1)
+START = date(2025, 1, 1)
+PAGE_SIZE = 100
+
+def key(i: int, salt: int = 0) -> UUID:
+    return UUID(int=((i + salt) * SCATTER) % (1 << 128))
+
+# entity -> (parent field or None, make(row number, parent id, revision)).
+# Updates write revision 1 of a row, which keeps its id and parent.
+ROWS = {
+    "users": (None, lambda i, parent, revision: User(user_id=key(i), username=f"user{i}.{revision}", role=Role.SUPERINTENDENT)),
+    "crews": ("project_id", lambda i, parent, revision: Crew(crew_id=key(i), name=f"crew{i}.{revision}", project_id=parent)),
+    "projects": (None, lambda i, parent, revision: Project(project_id=key(i), name=f"project{i}.{revision}", start_date=START, end_date=START + timedelta(days=30 + revision))),
+    "metrics": ("crew_id", lambda i, parent, revision: PerformanceMetric(metric_id=key(i), crew_id=parent, date=START + timedelta(days=i % 365), productivity=(i + revision) % 100 / 100, tasks_completed=(i + revision) % 10, tasks_total=10, hours_worked=8.0)),
+    "activities": ("project_id", lambda i, parent, revision: Activity(activity_id=key(i), project_id=parent, description=f"activity{i}.{revision}", constraint="none", start_date=START, end_date=START + timedelta(days=1 + i % 90))),
+    "shipments": ("project_id", lambda i, parent, revision: Shipment(shipment_id=key(i), project_id=parent, location=f"yard{i % 7}", contents=f"shipment{i}.{revision}", status=list(ShipmentStatus)[(i + revision) % len(ShipmentStatus)], arrival_date=START, customs_date=START + timedelta(days=1), laydown_date=START + timedelta(days=2), available_date=START + timedelta(days=3))),
+    "statuses": ("project_id", lambda i, parent, revision: ScheduleStatus(status_id=key(i), project_id=parent, phase=f"phase{i}.{revision}", status=list(ScheduleStatusEnum)[(i + revision) % len(ScheduleStatusEnum)], last_updated=START + timedelta(days=i % 365))),
+    "reports": ("crew_id", lambda i, parent, revision: TimeReport(report_id=key(i), crew_id=parent, user_id=FOREMAN, date=START + timedelta(days=i % 365), member_name=f"member{i % 50}", task=f"task{i}.{revision}", hours=8.0, effort_percentage=(i + revision) % 100)),
+}
+
+async def resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+@asynccontextmanager
+async def open_backend(backend: str):
+    # Yields repository(entity), an async context manager around one
+    # operation's repository. Storage goes to the backend's default paths
+    # under the current directory.
+    classes = repository_classes(backend)
+    match backend:
+        case "SQL" | "ASYNCSQL":
+            from database import create_sqlite_engine, create_async_sqlite_engine, ensure_schema
+            from sqlmodel import Session
+            from sqlmodel.ext.asyncio.session import AsyncSession
+            engine = create_sqlite_engine("sqlite:///bench.db")
+            ensure_schema(engine)
+            if backend == "SQL":
+                @asynccontextmanager
+                async def repository(entity: str):
+                    with Session(engine) as db:
+                        yield classes[entity](db)
+                yield repository
+            else:
+                async_engine = create_async_sqlite_engine("sqlite+aiosqlite:///bench.db")
+                @asynccontextmanager
+                async def repository(entity: str):
+                    async with AsyncSession(async_engine) as db:
+                        yield classes[entity](db)
+                yield repository
+                await async_engine.dispose()
+            engine.dispose()
+        case _:
+            from repositories.memory_storage import open_store, close_store
+            os.makedirs("data", exist_ok=True)
+            if backend == "MEM":
+                open_store("data/memory")
+            instances = {}
+
+            @asynccontextmanager
+            async def repository(entity: str):
+                if entity not in instances:
+                    instances[entity] = classes[entity]()
+                yield instances[entity]
+            yield repository
+            if backend == "MEM":
+                close_store()
+
+async def measure(repository, entity: str, calls) -> list:
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        async with repository(entity) as repo:
+            await resolve(call(repo))
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(operation: str, samples: list, count: int = None) -> dict:
+    # count is the rows handled when one sample covers several (bulk inserts).
+    ordered = sorted(samples)
+    seconds = sum(samples)
+    count = len(samples) if count is None else count
+    return {
+        "operation": operation,
+        "count": count,
+        "seconds": round(seconds, 6),
+        "per_second": round(count / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+    }
+
+async def run_workload(backend: str, entity: str, rows: int, ops: int, batch: int, partition_rows: int, seed: int) -> list:
+    rng = random.Random(seed)
+    parent_field, make = ROWS[entity]
+    parents = max(1, rows // partition_rows)
+
+    def parent(i: int) -> UUID:
+        return key(i % parents, PARENT_SALT) if parent_field else None
+
+    def row(i: int, revision: int = 0):
+        return make(i, parent(i), revision)
+
+    # Time report writes need a Foreman in the same backend.
+    extra = (FOREMAN,) if entity == "reports" else ()
+    results = []
+    async with open_backend(backend) as repository:
+        if extra:
+            async with repository("users") as users:
+                await resolve(users.create(User(user_id=FOREMAN, username="foreman", role=Role.FOREMAN)))
+
+        batches = (range(start, min(rows, start + batch)) for start in range(0, rows, batch))
+        samples = []
+        for numbers in batches:
+            items = [row(i) for i in numbers]
+            samples += await measure(repository, entity, [lambda repo: repo.create_many(items, *extra)])
+        results.append(summarize("bulk_insert", samples, rows))
+
+        reads = [rng.randrange(rows) for _ in range(ops)]
+        results.append(summarize("point_read", await measure(repository, entity, [lambda repo, i=i: repo.get_by_id(key(i)) for i in reads])))
+
+        if parent_field:
+            lists = [lambda repo, p=rng.randrange(parents): repo.get_all(key(p, PARENT_SALT)) for _ in range(ops)]
+        else:
+            lists = [lambda repo, i=rng.randrange(rows): repo.get_all(PAGE_SIZE, key(i)) for _ in range(ops)]
+        results.append(summarize("filtered_list", await measure(repository, entity, lists)))
+
+        inserts = [lambda repo, i=rows + n: repo.create(row(i), *extra) for n in range(ops)]
+        results.append(summarize("insert", await measure(repository, entity, inserts)))
+
+        updates = [lambda repo, i=rng.randrange(rows): repo.update(key(i), row(i, 1), *extra) for _ in range(ops)]
+        results.append(summarize("update", await measure(repository, entity, updates)))
+
+        deletes = [lambda repo, i=i: repo.delete(key(i)) for i in rng.sample(range(rows), min(ops, rows))]
+        results.append(summarize("delete", await measure(repository, entity, deletes)))
+    return results
+
+def peak_rss_mb():
+    # resource is POSIX-only; on Windows the suite reports no peak RSS.
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run_child(args) -> int:
+    backend, entity, rows = args.run[0], args.run[1], int(args.run[2])
+    results = asyncio.run(run_workload(backend, entity, rows, args.ops, args.batch, args.partition_rows, args.seed))
+    peak = peak_rss_mb()
+    for result in results:
+        result.update(backend=backend, entity=entity, rows=rows)
+        if peak is not None:
+            result["peak_rss_mb"] = peak
+    json.dump(results, sys.stdout)
+    return 0
+
+def run_one(args, backend: str, entity: str, rows: int) -> list:
+    # A fresh interpreter in a scratch directory next to the real data,
+    # importing from this cms_api directory.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    command = [
+        sys.executable, "-m", "benchmarks.repository_suite", "--run", backend, entity, str(rows),
+        "--ops", str(args.ops), "--batch", str(args.batch), "--partition-rows", str(args.partition_rows), "--seed", str(args.seed),
+    ]
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        output = subprocess.run(command, cwd=directory, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+def write_results(results: list, output_format: str, output) -> None:
+    if output_format == "json":
+        json.dump(results, output, indent=2)
+        output.write("\n")
+    else:
+        writer = csv.DictWriter(output, fieldnames=[field for field in FIELDS if any(field in result for result in results)])
+        writer.writeheader()
+        writer.writerows(results)
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="default: all backends")
+    parser.add_argument("--entity", action="append", choices=ENTITIES, help="default: every entity the backend has")
+    parser.add_argument("--rows", action="append", type=int, help="table size, repeatable (default: 1000)")
+    parser.add_argument("--ops", type=int, default=1000, help="timed operations of each kind")
+    parser.add_argument("--batch", type=int, default=10_000, help="rows per create_many in the bulk insert")
+    parser.add_argument("--partition-rows", type=int, default=1000, help="rows per project or crew")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", help="default: stdout")
+    parser.add_argument("--run", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        return run_child(args)
+
+    results = []
+    for backend in args.backend or BACKENDS:
+        entities = repository_classes(backend)
+        for entity in args.entity or ENTITIES:
+            if entity not in entities:
+                continue
+            for rows in args.rows or [1000]:
+                for result in run_one(args, backend, entity, rows):
+                    results.append({field: result[field] for field in FIELDS if field in result})
+                    rss = f"  rss {result['peak_rss_mb']} MB" if "peak_rss_mb" in result else ""
+                    print(f"{backend:>8} {entity:>10} {rows:>9} {result['operation']:>13}: {result['per_second']:>11} /s  p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms{rss}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", newline="") as output:
+            write_results(results, args.format, output)
+    else:
+        write_results(results, args.format, sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session
+from models import PerformanceMetric
+from database import SQLITE_PROFILES, create_sqlite_engine, Project as ProjectModel, Crew as CrewModel, PerformanceMetric as MetricModel
+from repositories.sqlmodel_repo import SQLModelPerformanceMetricRepository
+
+# Mixed read/write load against a scratch SQLite file under each engine
+# profile in database.py. Worker threads either list a crew's metrics or
+# insert one through the SQLModel repository, each on its own session, for a
+# fixed time; throughput and failed operations ("database is locked") are
+# reported per profile.
+# Run from cms_api/: python -m benchmarks.sqlite_profile
+
+def seed(engine, crews: int, metrics_per_crew: int) -> list:
+    project_id = str(uuid4())
+    crew_ids = [str(uuid4()) for _ in range(crews)]
+    with Session(engine) as db:
+        db.add(ProjectModel(project_id=project_id, name="bench", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31)))
+        for crew_id in crew_ids:
+            db.add(CrewModel(crew_id=crew_id, name="bench", project_id=project_id))
+            for i in range(metrics_per_crew):
+                db.add(MetricModel(metric_id=str(uuid4()), crew_id=crew_id, date=date(2025, 1, 1) + timedelta(days=i % 365), productivity=random.random(), tasks_completed=5, tasks_total=10, hours_worked=8.0))
+        db.commit()
+    return crew_ids
+
+def worker(engine, crew_ids: list, write_ratio: float, deadline: float, counts: dict, lock: threading.Lock) -> None:
+    reads = writes = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            with Session(engine) as db:
+                repository = SQLModelPerformanceMetricRepository(db)
+                if random.random() < write_ratio:
+                    repository.create(PerformanceMetric(metric_id=uuid4(), crew_id=random.choice(crew_ids), date=date(2025, 6, 1), productivity=0.5, tasks_completed=5, tasks_total=10, hours_worked=8.0))
+                    writes += 1
+                else:
+                    repository.get_all(random.choice(crew_ids))
+                    reads += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        counts["reads"] += reads
+        counts["writes"] += writes
+        counts["errors"] += errors
+
+def run(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        SQLModel.metadata.create_all(engine)
+        crew_ids = seed(engine, args.crews, args.metrics)
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=worker, args=(engine, crew_ids, args.write_ratio, deadline, counts, lock)) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return counts
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--crews", type=int, default=50)
+    parser.add_argument("--metrics", type=int, default=20, help="metrics seeded per crew")
+    parser.add_argument("--profile", action="append", choices=list(SQLITE_PROFILES), help="default: all profiles")
+    args = parser.parse_args()
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g}s per profile")
+    for profile in args.profile or list(SQLITE_PROFILES):
+        counts = run(profile, args)
+        total = counts["reads"] + counts["writes"]
+        print(f"{profile:>8}: {total / args.seconds:8,.0f} ops/s  ({counts['reads']} reads, {counts['writes']} writes, {counts['errors']} failed)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
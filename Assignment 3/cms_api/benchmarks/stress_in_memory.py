@@ -0,0 +1,126 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from uuid import UUID, uuid4
+from fastapi import HTTPException
+from models import Activity, PerformanceMetric, Role, TimeReport, User
+import repositories.memory_storage as memory_storage
+from repositories.in_memory_repo import InMemoryActivityRepository, InMemoryPerformanceMetricRepository, InMemoryTimeReportRepository, InMemoryUserRepository
+
+# Hammers the shared in-memory tables from many threads at once: creates,
+# filtered listings, lookups, updates (including moves between parents) and
+# deletes. Every read is checked as it happens, and at the end each table must
+# hold exactly the rows the workers believe are live.
+# Run from cms_api/: python -m benchmarks.stress_in_memory
+# tests/test_in_memory_concurrency.py runs a short version with every test run.
+
+PARENTS = [uuid4() for _ in range(64)]
+FOREMAN = uuid4()
+
+def new_metric(metric_id: UUID = None) -> PerformanceMetric:
+    return PerformanceMetric(metric_id=metric_id or uuid4(), crew_id=random.choice(PARENTS), date=date(2025, 1, 1) + timedelta(days=random.randrange(365)), productivity=random.random(), tasks_completed=random.randrange(10), tasks_total=10, hours_worked=random.random() * 8)
+
+def new_report(report_id: UUID = None) -> TimeReport:
+    return TimeReport(report_id=report_id or uuid4(), crew_id=random.choice(PARENTS), user_id=uuid4(), date=date(2025, 1, 1) + timedelta(days=random.randrange(365)), member_name=random.choice(["Ann Lee", "Bob Stone", "Cy Park"]), task=random.choice(["weld", "pipe", "rig"]), hours=random.random() * 8, effort_percentage=random.random() * 100)
+
+def new_activity(activity_id: UUID = None) -> Activity:
+    return Activity(activity_id=activity_id or uuid4(), project_id=random.choice(PARENTS), description="stress", constraint="none", start_date=date(2025, 1, 1), end_date=date(2025, 2, 1))
+
+# (repository, factory, id field, parent field, extra args for create/update)
+TABLES = [
+    (InMemoryPerformanceMetricRepository, new_metric, "metric_id", "crew_id", ()),
+    (InMemoryTimeReportRepository, new_report, "report_id", "crew_id", (FOREMAN,)),
+    (InMemoryActivityRepository, new_activity, "activity_id", "project_id", ()),
+]
+
+def check_listing(items: list, parent_field: str, parent: UUID, id_field: str) -> None:
+    ids = [getattr(item, id_field) for item in items]
+    assert len(ids) == len(set(ids)), "duplicate rows in a listing"
+    assert all(getattr(item, parent_field) == parent for item in items), "row listed under the wrong parent"
+
+def worker(operations: int, owned: list, errors: list) -> None:
+    # owned[i] maps id -> latest model for the rows this thread created in
+    # table i; only this thread updates or deletes them, so it knows their state.
+    try:
+        for _ in range(operations):
+            i = random.randrange(len(TABLES))
+            repository_type, factory, id_field, parent_field, extra = TABLES[i]
+            repository = repository_type()
+            mine = owned[i]
+            op = random.random()
+            if op < 0.4 or not mine:
+                item = factory()
+                repository.create(item, *extra)
+                mine[getattr(item, id_field)] = item
+            elif op < 0.6:
+                parent = random.choice(PARENTS)
+                check_listing(repository.get_all(parent), parent_field, parent, id_field)
+            elif op < 0.75:
+                item_id = random.choice(list(mine))
+                assert repository.get_by_id(item_id) == mine[item_id], "lookup returned a stale row"
+            elif op < 0.9:
+                item_id = random.choice(list(mine))
+                item = factory(item_id)
+                repository.update(item_id, item, *extra)
+                mine[item_id] = item
+            else:
+                item_id = random.choice(list(mine))
+                repository.delete(item_id)
+                del mine[item_id]
+                try:
+                    repository.get_by_id(item_id)
+                    raise AssertionError("deleted row still readable")
+                except HTTPException:
+                    pass
+    except Exception as e:
+        errors.append(e)
+
+def check_contents(owned: list, errors: list) -> None:
+    # After the workers finish, each table must list exactly the rows they
+    # believe are live, under the right parents.
+    for i, (repository_type, _, id_field, parent_field, _) in enumerate(TABLES):
+        expected = {}
+        for mine in owned:
+            expected.update(mine[i])
+        repository = repository_type()
+        for parent in PARENTS:
+            listed = repository.get_all(parent)
+            try:
+                check_listing(listed, parent_field, parent, id_field)
+            except AssertionError as e:
+                errors.append(e)
+            wanted = {item_id: item for item_id, item in expected.items() if getattr(item, parent_field) == parent}
+            if {getattr(item, id_field): item for item in listed} != wanted:
+                errors.append(AssertionError(f"{repository_type.__name__}: final contents differ for {parent}"))
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=5_000, help="operations per thread")
+    args = parser.parse_args()
+    # Switch threads as often as possible and compact early and often, so the
+    # interleavings that matter actually happen.
+    sys.setswitchinterval(1e-5)
+    memory_storage.COMPACT_MIN_ROWS = 64
+    InMemoryUserRepository().create(User(user_id=FOREMAN, username="stress", role=Role.FOREMAN))
+    owned = [[{} for _ in TABLES] for _ in range(args.threads)]
+    errors = []
+    threads = [threading.Thread(target=worker, args=(args.operations, owned[t], errors)) for t in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    check_contents(owned, errors)
+    total = args.threads * args.operations
+    print(f"{total} operations on {args.threads} threads in {elapsed:.2f}s ({total / elapsed:,.0f} ops/s)")
+    for e in errors[:10]:
+        print(f"FAILED: {type(e).__name__}: {e}")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
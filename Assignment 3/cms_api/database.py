@@ -1,11 +1,62 @@
+import os
 from datetime import date
 from sqlmodel import SQLModel, create_engine, Session, Field, Enum
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Index, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
 from enum import Enum as PyEnum
 from typing import Optional
 
+# Connections per engine: one per threadpool worker that can hold a session,
+# sized like ThreadPoolExecutor's default, with the same again as overflow.
+POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+# SQLite engine profiles. "tuned" puts the database in WAL mode so readers no
+# longer block behind a writer, relaxes fsyncs to checkpoints
+# (synchronous=NORMAL, still safe in WAL mode), memory-maps and caches more of
+# the file, and has writers wait for the lock instead of failing with
+# "database is locked". "default" leaves SQLite's own settings.
+SQLITE_PROFILES = {
+    "default": {"pragmas": {}, "pool": {}},
+    "tuned": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64000,  # negative: KiB, so ~64 MB
+            "busy_timeout": 5000,  # ms
+        },
+        "pool": {"pool_size": POOL_SIZE, "max_overflow": POOL_SIZE, "pool_timeout": 30},
+    },
+}
+SQLITE_PROFILE = "tuned"
+
+def set_pragmas(engine, pragmas: dict) -> None:
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_sqlite_engine(url: str, profile: str = SQLITE_PROFILE):
+    settings = SQLITE_PROFILES[profile]
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **settings["pool"])
+    set_pragmas(engine, settings["pragmas"])
+    return engine
+
+def create_async_sqlite_engine(url: str, profile: str = SQLITE_PROFILE):
+    settings = SQLITE_PROFILES[profile]
+    engine = create_async_engine(url, **settings["pool"])
+    set_pragmas(engine.sync_engine, settings["pragmas"])
+    return engine
+
 # SQLite database
 DATABASE_URL = "sqlite:///cms.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_sqlite_engine(DATABASE_URL)
+# Same file through aiosqlite, for the async repositories
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///cms.db"
+async_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL)
 
 # Enums
 class Role(PyEnum):
@@ -35,6 +86,7 @@ class User(SQLModel, table=True):
     role: Role = Field(sa_type=Enum(Role, values_callable=lambda x: [e.value for e in x]))
 
 class Crew(SQLModel, table=True):
+    __table_args__ = (Index("ix_crew_project_id_crew_id", "project_id", "crew_id"),)
     crew_id: str = Field(primary_key=True)
     name: str
     project_id: str = Field(foreign_key="project.project_id")
@@ -46,6 +98,10 @@ class Project(SQLModel, table=True):
     end_date: date
 
 class PerformanceMetric(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_performancemetric_crew_id_date", "crew_id", "date"),
+        Index("ix_performancemetric_crew_id_metric_id", "crew_id", "metric_id"),
+    )
     metric_id: str = Field(primary_key=True)
     crew_id: str = Field(foreign_key="crew.crew_id")
     date: date
@@ -55,6 +111,7 @@ class PerformanceMetric(SQLModel, table=True):
     hours_worked: float
 
 class Activity(SQLModel, table=True):
+    __table_args__ = (Index("ix_activity_project_id_activity_id", "project_id", "activity_id"),)
     activity_id: str = Field(primary_key=True)
     project_id: str = Field(foreign_key="project.project_id")
     description: str
@@ -63,6 +120,7 @@ class Activity(SQLModel, table=True):
     end_date: date
 
 class Shipment(SQLModel, table=True):
+    __table_args__ = (Index("ix_shipment_project_id_shipment_id", "project_id", "shipment_id"),)
     shipment_id: str = Field(primary_key=True)
     project_id: str = Field(foreign_key="project.project_id")
     location: str
@@ -74,6 +132,7 @@ class Shipment(SQLModel, table=True):
     available_date: date
 
 class ScheduleStatus(SQLModel, table=True):
+    __table_args__ = (Index("ix_schedulestatus_project_id_status_id", "project_id", "status_id"),)
     status_id: str = Field(primary_key=True)
     project_id: str = Field(foreign_key="project.project_id")
     phase: str
@@ -81,6 +140,10 @@ class ScheduleStatus(SQLModel, table=True):
     last_updated: date
 
 class TimeReport(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_timereport_crew_id_date", "crew_id", "date"),
+        Index("ix_timereport_crew_id_report_id", "crew_id", "report_id"),
+    )
     report_id: str = Field(primary_key=True)
     crew_id: str = Field(foreign_key="crew.crew_id")
     user_id: str = Field(foreign_key="user.user_id")
@@ -90,9 +153,89 @@ class TimeReport(SQLModel, table=True):
     hours: float
     effort_percentage: float
 
-# Create tables
-SQLModel.metadata.create_all(engine)
+VERSIONED_TABLES = ["user", "crew", "project", "performancemetric", "activity", "shipment", "schedulestatus", "timereport"]
+
+def version_triggers(tables: list) -> list:
+    statements = []
+    for table in tables:
+        statements.append(f"INSERT OR IGNORE INTO tableversion (name, version) VALUES ('{table}', abs(random() % 1000000000000))")
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(
+                f'CREATE TRIGGER IF NOT EXISTS "{table}_version_{operation.lower()}" AFTER {operation} ON "{table}" '
+                f"BEGIN UPDATE tableversion SET version = version + 1 WHERE name = '{table}'; END"
+            )
+    return statements
+
+# Schema migrations for databases created before a change to the tables.
+# create_all builds missing tables (with their indexes) but never alters
+# existing ones, so each step here brings an older file up to date and
+# PRAGMA user_version records how many have been applied. Append new steps;
+# never edit or reorder applied ones.
+MIGRATIONS = [
+    # 1: indexes for the foreign keys get_all filters on. Metrics and time
+    # reports are listed per crew and usually by date, so they get composite
+    # (crew_id, date) indexes, which also cover crew_id alone.
+    [
+        "CREATE INDEX IF NOT EXISTS ix_crew_project_id ON crew (project_id)",
+        "CREATE INDEX IF NOT EXISTS ix_activity_project_id ON activity (project_id)",
+        "CREATE INDEX IF NOT EXISTS ix_shipment_project_id ON shipment (project_id)",
+        "CREATE INDEX IF NOT EXISTS ix_schedulestatus_project_id ON schedulestatus (project_id)",
+        "CREATE INDEX IF NOT EXISTS ix_performancemetric_crew_id_date ON performancemetric (crew_id, date)",
+        "CREATE INDEX IF NOT EXISTS ix_timereport_crew_id_date ON timereport (crew_id, date)",
+        "ANALYZE",
+    ],
+    # 2: keyset pagination orders each listing by primary key, so index the
+    # filter column together with the key; the project_id-only indexes are
+    # covered by the new ones.
+    [
+        "DROP INDEX IF EXISTS ix_crew_project_id",
+        "DROP INDEX IF EXISTS ix_activity_project_id",
+        "DROP INDEX IF EXISTS ix_shipment_project_id",
+        "DROP INDEX IF EXISTS ix_schedulestatus_project_id",
+        "CREATE INDEX IF NOT EXISTS ix_crew_project_id_crew_id ON crew (project_id, crew_id)",
+        "CREATE INDEX IF NOT EXISTS ix_activity_project_id_activity_id ON activity (project_id, activity_id)",
+        "CREATE INDEX IF NOT EXISTS ix_shipment_project_id_shipment_id ON shipment (project_id, shipment_id)",
+        "CREATE INDEX IF NOT EXISTS ix_schedulestatus_project_id_status_id ON schedulestatus (project_id, status_id)",
+        "CREATE INDEX IF NOT EXISTS ix_performancemetric_crew_id_metric_id ON performancemetric (crew_id, metric_id)",
+        "CREATE INDEX IF NOT EXISTS ix_timereport_crew_id_report_id ON timereport (crew_id, report_id)",
+        "ANALYZE",
+    ],
+    # 3: a write counter per table behind the ETags of GET routes. Triggers
+    # bump it, so writes from any process or connection count, including
+    # bulk inserts and raw SQL. Counters start at a random value, so a
+    # recreated database does not hand out ETags an old one used.
+    [
+        "CREATE TABLE IF NOT EXISTS tableversion (name VARCHAR PRIMARY KEY, version INTEGER NOT NULL)",
+        *version_triggers(VERSIONED_TABLES),
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate(engine) -> int:
+    with engine.begin() as connection:
+        version = connection.execute(text("PRAGMA user_version")).scalar()
+        for statements in MIGRATIONS[version:]:
+            for statement in statements:
+                connection.execute(text(statement))
+        if version != SCHEMA_VERSION:
+            connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    return version
+
+# Called from the app's lifespan rather than at import, so importing this
+# module (a worker boot, a script, a test) never touches the file. A database
+# already at SCHEMA_VERSION costs one PRAGMA instead of create_all's per-table
+# reflection.
+def ensure_schema(engine) -> None:
+    with engine.connect() as connection:
+        if connection.execute(text("PRAGMA user_version")).scalar() == SCHEMA_VERSION:
+            return
+    SQLModel.metadata.create_all(engine)
+    migrate(engine)
 
 def get_db():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_db():
+    async with AsyncSession(async_engine) as session:
+        yield session
@@ -1,106 +1,160 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
+import inspect
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from enum import Enum
+from operator import attrgetter
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from uuid import UUID
-from typing import List
+from typing import AsyncIterable, Iterable, List
 from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport, Role
 from repositories.base import UserRepository, CrewRepository, ProjectRepository, PerformanceMetricRepository, ActivityRepository, ShipmentRepository, ScheduleStatusRepository, TimeReportRepository
-from repositories.sqlmodel_repo import SQLModelUserRepository, SQLModelCrewRepository, SQLModelProjectRepository, SQLModelPerformanceMetricRepository, SQLModelActivityRepository, SQLModelShipmentRepository, SQLModelScheduleStatusRepository, SQLModelTimeReportRepository
-from repositories.csv_repo import CSVUserRepository, CSVCrewRepository, CSVProjectRepository, CSVPerformanceMetricRepository, CSVActivityRepository, CSVShipmentRepository, CSVScheduleStatusRepository, CSVTimeReportRepository
-from repositories.in_memory_repo import InMemoryUserRepository, InMemoryCrewRepository, InMemoryProjectRepository, InMemoryPerformanceMetricRepository, InMemoryActivityRepository, InMemoryShipmentRepository, InMemoryScheduleStatusRepository, InMemoryTimeReportRepository
-from database import get_db
-
-app = FastAPI(title="Construction Management System API")
-repotype =  "SQL"                #"SQL" "CSV" or "MEM"
+from repositories.registry import ENTITIES, RepositoryRegistry
+from repositories.memory_storage import open_store, close_store
+from database import engine, async_engine, ensure_schema
+
+# Backends are picked per process from the environment, e.g.
+# CMS_REPOTYPE=MEM uvicorn main:app
+repotype = os.environ.get("CMS_REPOTYPE", "SQL")                    # "SQL" "ASYNCSQL" "CSV" "MEM" or "PARQUET"
+metric_repotype = os.environ.get("CMS_METRIC_REPOTYPE", repotype)   # or "MMAP" for the memory-mapped metric store
+memory_store_dir = os.environ.get("CMS_MEMORY_DIR", "data/memory")  # MEM snapshots and journal
+backends = {repotype, metric_repotype}
+
+registry = RepositoryRegistry({entity: metric_repotype if entity == "metrics" else repotype for entity in ENTITIES})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if backends & {"SQL", "ASYNCSQL"}:
+        ensure_schema(engine)
+    # The MEM backend warm-starts from its last snapshot plus journal and
+    # snapshots again on shutdown.
+    if "MEM" in backends:
+        open_store(memory_store_dir)
+    registry.build()
+    yield
+    registry.clear()
+    if "MEM" in backends:
+        close_store()
+    # aiosqlite runs each pooled connection on its own thread; close them.
+    await async_engine.dispose()
+
+app = FastAPI(title="Construction Management System API", lifespan=lifespan)
 
 # Dependencies for repositories
-def get_user_repository(db: Session = Depends(get_db)) -> UserRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelUserRepository(db)  
-        case "CSV":
-            return CSVUserRepository() 
-        case "MEM":
-            return InMemoryUserRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_crew_repository(db: Session = Depends(get_db)) -> CrewRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelCrewRepository(db)  
-        case "CSV":
-            return CSVCrewRepository() 
-        case "MEM":
-            return InMemoryCrewRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_project_repository(db: Session = Depends(get_db)) -> ProjectRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelProjectRepository(db)  
-        case "CSV":
-            return CSVProjectRepository() 
-        case "MEM":
-            return InMemoryProjectRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_metric_repository(db: Session = Depends(get_db)) -> PerformanceMetricRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelPerformanceMetricRepository(db)  
-        case "CSV":
-            return CSVPerformanceMetricRepository() 
-        case "MEM":
-            return InMemoryPerformanceMetricRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-
-def get_activity_repository(db: Session = Depends(get_db)) -> ActivityRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelActivityRepository(db)  
-        case "CSV":
-            return CSVActivityRepository() 
-        case "MEM":
-            return InMemoryActivityRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_shipment_repository(db: Session = Depends(get_db)) -> ShipmentRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelShipmentRepository(db)  
-        case "CSV":
-            return CSVShipmentRepository() 
-        case "MEM":
-            return InMemoryShipmentRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_status_repository(db: Session = Depends(get_db)) -> ScheduleStatusRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelScheduleStatusRepository(db)  
-        case "CSV":
-            return CSVScheduleStatusRepository() 
-        case "MEM":
-            return InMemoryScheduleStatusRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
-
-def get_report_repository(db: Session = Depends(get_db)) -> TimeReportRepository:
-    match repotype:
-        case "SQL":
-            return SQLModelTimeReportRepository(db)  
-        case "CSV":
-            return CSVTimeReportRepository() 
-        case "MEM":
-            return InMemoryTimeReportRepository()
-        case _:
-            raise ValueError("Invalid repotype. Use 'SQL', 'CSV', or 'MEM'.")
+get_user_repository = registry.dependency("users")
+get_crew_repository = registry.dependency("crews")
+get_project_repository = registry.dependency("projects")
+get_metric_repository = registry.dependency("metrics")
+get_activity_repository = registry.dependency("activities")
+get_shipment_repository = registry.dependency("shipments")
+get_status_repository = registry.dependency("statuses")
+get_report_repository = registry.dependency("reports")
+
+async def resolve(result):
+    # Async repositories return coroutines, the others plain values.
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+def ndjson_lines(items: Iterable) -> Iterable[str]:
+    for item in items:
+        yield item.model_dump_json() + "\n"
+
+async def ndjson_lines_async(items: AsyncIterable) -> AsyncIterable[str]:
+    async for item in items:
+        yield item.model_dump_json() + "\n"
+
+def ndjson_response(response: Response, items) -> StreamingResponse:
+    lines = ndjson_lines_async(items) if hasattr(items, "__aiter__") else ndjson_lines(items)
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers=response.headers)
+
+# Conditional GET: every list and detail response carries an ETag built from
+# the repository's version (a write counter, or a signature of the backend's
+# files; per table, or per partition for listings filtered by project or crew
+# where the backend can tell them apart). A client that sends it back in
+# If-None-Match gets 304 Not Modified from the version alone, before the
+# repository reads any rows.
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+async def check_etag(response: Response, if_none_match: str, version) -> None:
+    etag = f'"{await resolve(version)}"'
+    if if_none_match is not None and etag_matches(etag, if_none_match):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+# Keyset pagination: list endpoints take ?limit=&cursor= and return the page
+# in key order. When a page is full, X-Next-Cursor carries the cursor for the
+# next one; clients pass it back verbatim and stop when the header is absent.
+def decode_cursor(cursor: str):
+    if cursor is None:
+        return None
+    try:
+        return UUID(urlsafe_b64decode(cursor).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(response: Response, items: list, limit: int, key: str):
+    if limit is not None and len(items) == limit:
+        response.headers["X-Next-Cursor"] = urlsafe_b64encode(str(getattr(items[-1], key)).encode()).decode()
+    return list_response(response, items)
+
+# Fast list responses (CMS_FAST_JSON=1): repositories already return
+# validated models, so lists are encoded straight to JSON bytes instead of
+# FastAPI validating every item again and re-encoding it with json.dumps.
+# Returning a Response bypasses response_model, which still documents the
+# route. orjson is used for SQL rows when installed, otherwise json.
+fast_json = os.environ.get("CMS_FAST_JSON") == "1"
+list_encoders = {}
+
+try:
+    import orjson
+
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+except ImportError:
+    def json_default(value):
+        if isinstance(value, UUID):
+            return str(value)
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.value
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def list_encoder(model):
+    if not hasattr(model, "__table__"):
+        # API models: pydantic-core writes the whole list, UUIDs, dates and
+        # enums included, without validating it.
+        return TypeAdapter(List[model]).dump_json
+    # SQL rows hold their values in the order SQLAlchemy loaded them, so
+    # read them in field order to match the normal response.
+    fields = tuple(model.model_fields)
+    values = attrgetter(*fields)
+    return lambda rows: dumps([dict(zip(fields, values(row))) for row in rows])
+
+def encode_list(items: list) -> bytes:
+    if not items:
+        return b"[]"
+    model = type(items[0])
+    encoder = list_encoders.get(model)
+    if encoder is None:
+        encoder = list_encoders[model] = list_encoder(model)
+    return encoder(items)
+
+def list_response(response: Response, items: list):
+    if not fast_json:
+        return items
+    return Response(encode_list(items), media_type="application/json", headers=response.headers)
 
 # Health check
 @app.get("/health")
@@ -110,177 +164,237 @@ async def health_check():
 # CRUD for User
 @app.post("/users/", response_model=User)
 async def create_user(user: User, repo: UserRepository = Depends(get_user_repository)):
-    return repo.create(user)
+    return await resolve(repo.create(user))
+
+@app.post("/users/bulk", response_model=List[User])
+async def create_users(users: List[User], repo: UserRepository = Depends(get_user_repository)):
+    return await resolve(repo.create_many(users))
 
 @app.get("/users/", response_model=List[User])
-async def read_users(repo: UserRepository = Depends(get_user_repository)):
-    return repo.get_all()
+async def read_users(response: Response, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: UserRepository = Depends(get_user_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    items = await resolve(repo.get_all(limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "user_id")
 
 @app.get("/users/{user_id}", response_model=User)
-async def read_user(user_id: UUID, repo: UserRepository = Depends(get_user_repository)):
-    return repo.get_by_id(user_id)
+async def read_user(response: Response, user_id: UUID, if_none_match: str = Header(None), repo: UserRepository = Depends(get_user_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(user_id))
 
 @app.put("/users/{user_id}", response_model=User)
 async def update_user(user_id: UUID, updated_user: User, repo: UserRepository = Depends(get_user_repository)):
-    return repo.update(user_id, updated_user)
+    return await resolve(repo.update(user_id, updated_user))
 
 @app.delete("/users/{user_id}")
 async def delete_user(user_id: UUID, repo: UserRepository = Depends(get_user_repository)):
-    repo.delete(user_id)
+    await resolve(repo.delete(user_id))
     return {"detail": "User deleted"}
 
 # CRUD for Crew
 @app.post("/crews/", response_model=Crew)
 async def create_crew(crew: Crew, repo: CrewRepository = Depends(get_crew_repository)):
-    return repo.create(crew)
+    return await resolve(repo.create(crew))
+
+@app.post("/crews/bulk", response_model=List[Crew])
+async def create_crews(crews: List[Crew], repo: CrewRepository = Depends(get_crew_repository)):
+    return await resolve(repo.create_many(crews))
 
 @app.get("/crews/", response_model=List[Crew])
-async def read_crews(project_id: UUID = None, repo: CrewRepository = Depends(get_crew_repository)):
-    return repo.get_all(project_id)
+async def read_crews(response: Response, project_id: UUID = None, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: CrewRepository = Depends(get_crew_repository)):
+    await check_etag(response, if_none_match, repo.version(project_id))
+    items = await resolve(repo.get_all(project_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "crew_id")
 
 @app.get("/crews/{crew_id}", response_model=Crew)
-async def read_crew(crew_id: UUID, repo: CrewRepository = Depends(get_crew_repository)):
-    return repo.get_by_id(crew_id)
+async def read_crew(response: Response, crew_id: UUID, if_none_match: str = Header(None), repo: CrewRepository = Depends(get_crew_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(crew_id))
 
 @app.put("/crews/{crew_id}", response_model=Crew)
 async def update_crew(crew_id: UUID, updated_crew: Crew, repo: CrewRepository = Depends(get_crew_repository)):
-    return repo.update(crew_id, updated_crew)
+    return await resolve(repo.update(crew_id, updated_crew))
 
 @app.delete("/crews/{crew_id}")
 async def delete_crew(crew_id: UUID, repo: CrewRepository = Depends(get_crew_repository)):
-    repo.delete(crew_id)
+    await resolve(repo.delete(crew_id))
     return {"detail": "Crew deleted"}
 
 # CRUD for Project
 @app.post("/projects/", response_model=Project)
 async def create_project(project: Project, repo: ProjectRepository = Depends(get_project_repository)):
-    return repo.create(project)
+    return await resolve(repo.create(project))
+
+@app.post("/projects/bulk", response_model=List[Project])
+async def create_projects(projects: List[Project], repo: ProjectRepository = Depends(get_project_repository)):
+    return await resolve(repo.create_many(projects))
 
 @app.get("/projects/", response_model=List[Project])
-async def read_projects(repo: ProjectRepository = Depends(get_project_repository)):
-    return repo.get_all()
+async def read_projects(response: Response, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: ProjectRepository = Depends(get_project_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    items = await resolve(repo.get_all(limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "project_id")
 
 @app.get("/projects/{project_id}", response_model=Project)
-async def read_project(project_id: UUID, repo: ProjectRepository = Depends(get_project_repository)):
-    return repo.get_by_id(project_id)
+async def read_project(response: Response, project_id: UUID, if_none_match: str = Header(None), repo: ProjectRepository = Depends(get_project_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(project_id))
 
 @app.put("/projects/{project_id}", response_model=Project)
 async def update_project(project_id: UUID, updated_project: Project, repo: ProjectRepository = Depends(get_project_repository)):
-    return repo.update(project_id, updated_project)
+    return await resolve(repo.update(project_id, updated_project))
 
 @app.delete("/projects/{project_id}")
 async def delete_project(project_id: UUID, repo: ProjectRepository = Depends(get_project_repository)):
-    repo.delete(project_id)
+    await resolve(repo.delete(project_id))
     return {"detail": "Project deleted"}
 
 # CRUD for PerformanceMetric
 @app.post("/metrics/", response_model=PerformanceMetric)
 async def create_metric(metric: PerformanceMetric, repo: PerformanceMetricRepository = Depends(get_metric_repository)):
-    return repo.create(metric)
+    return await resolve(repo.create(metric))
+
+@app.post("/metrics/bulk", response_model=List[PerformanceMetric])
+async def create_metrics(metrics: List[PerformanceMetric], repo: PerformanceMetricRepository = Depends(get_metric_repository)):
+    return await resolve(repo.create_many(metrics))
 
 @app.get("/metrics/", response_model=List[PerformanceMetric])
-async def read_metrics(crew_id: UUID, repo: PerformanceMetricRepository = Depends(get_metric_repository)):
-    return repo.get_all(crew_id)
+async def read_metrics(response: Response, crew_id: UUID, stream: bool = False, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: PerformanceMetricRepository = Depends(get_metric_repository)):
+    await check_etag(response, if_none_match, repo.version(crew_id))
+    if stream:
+        return ndjson_response(response, repo.iter_all(crew_id))
+    items = await resolve(repo.get_all(crew_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "metric_id")
 
 @app.get("/metrics/{metric_id}", response_model=PerformanceMetric)
-async def read_metric(metric_id: UUID, repo: PerformanceMetricRepository = Depends(get_metric_repository)):
-    return repo.get_by_id(metric_id)
+async def read_metric(response: Response, metric_id: UUID, if_none_match: str = Header(None), repo: PerformanceMetricRepository = Depends(get_metric_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(metric_id))
 
 @app.put("/metrics/{metric_id}", response_model=PerformanceMetric)
 async def update_metric(metric_id: UUID, updated_metric: PerformanceMetric, repo: PerformanceMetricRepository = Depends(get_metric_repository)):
-    return repo.update(metric_id, updated_metric)
+    return await resolve(repo.update(metric_id, updated_metric))
 
 @app.delete("/metrics/{metric_id}")
 async def delete_metric(metric_id: UUID, repo: PerformanceMetricRepository = Depends(get_metric_repository)):
-    repo.delete(metric_id)
+    await resolve(repo.delete(metric_id))
     return {"detail": "Metric deleted"}
 
 # CRUD for Activity
 @app.post("/activities/", response_model=Activity)
 async def create_activity(activity: Activity, repo: ActivityRepository = Depends(get_activity_repository)):
-    return repo.create(activity)
+    return await resolve(repo.create(activity))
+
+@app.post("/activities/bulk", response_model=List[Activity])
+async def create_activities(activities: List[Activity], repo: ActivityRepository = Depends(get_activity_repository)):
+    return await resolve(repo.create_many(activities))
 
 @app.get("/activities/", response_model=List[Activity])
-async def read_activities(project_id: UUID, repo: ActivityRepository = Depends(get_activity_repository)):
-    return repo.get_all(project_id)
+async def read_activities(response: Response, project_id: UUID, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: ActivityRepository = Depends(get_activity_repository)):
+    await check_etag(response, if_none_match, repo.version(project_id))
+    items = await resolve(repo.get_all(project_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "activity_id")
 
 @app.get("/activities/{activity_id}", response_model=Activity)
-async def read_activity(activity_id: UUID, repo: ActivityRepository = Depends(get_activity_repository)):
-    return repo.get_by_id(activity_id)
+async def read_activity(response: Response, activity_id: UUID, if_none_match: str = Header(None), repo: ActivityRepository = Depends(get_activity_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(activity_id))
 
 @app.put("/activities/{activity_id}", response_model=Activity)
 async def update_activity(activity_id: UUID, updated_activity: Activity, repo: ActivityRepository = Depends(get_activity_repository)):
-    return repo.update(activity_id, updated_activity)
+    return await resolve(repo.update(activity_id, updated_activity))
 
 @app.delete("/activities/{activity_id}")
 async def delete_activity(activity_id: UUID, repo: ActivityRepository = Depends(get_activity_repository)):
-    repo.delete(activity_id)
+    await resolve(repo.delete(activity_id))
     return {"detail": "Activity deleted"}
 
 # CRUD for Shipment
 @app.post("/shipments/", response_model=Shipment)
 async def create_shipment(shipment: Shipment, repo: ShipmentRepository = Depends(get_shipment_repository)):
-    return repo.create(shipment)
+    return await resolve(repo.create(shipment))
+
+@app.post("/shipments/bulk", response_model=List[Shipment])
+async def create_shipments(shipments: List[Shipment], repo: ShipmentRepository = Depends(get_shipment_repository)):
+    return await resolve(repo.create_many(shipments))
 
 @app.get("/shipments/", response_model=List[Shipment])
-async def read_shipments(project_id: UUID, repo: ShipmentRepository = Depends(get_shipment_repository)):
-    return repo.get_all(project_id)
+async def read_shipments(response: Response, project_id: UUID, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: ShipmentRepository = Depends(get_shipment_repository)):
+    await check_etag(response, if_none_match, repo.version(project_id))
+    items = await resolve(repo.get_all(project_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "shipment_id")
 
 @app.get("/shipments/{shipment_id}", response_model=Shipment)
-async def read_shipment(shipment_id: UUID, repo: ShipmentRepository = Depends(get_shipment_repository)):
-    return repo.get_by_id(shipment_id)
+async def read_shipment(response: Response, shipment_id: UUID, if_none_match: str = Header(None), repo: ShipmentRepository = Depends(get_shipment_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(shipment_id))
 
 @app.put("/shipments/{shipment_id}", response_model=Shipment)
 async def update_shipment(shipment_id: UUID, updated_shipment: Shipment, repo: ShipmentRepository = Depends(get_shipment_repository)):
-    return repo.update(shipment_id, updated_shipment)
+    return await resolve(repo.update(shipment_id, updated_shipment))
 
 @app.delete("/shipments/{shipment_id}")
 async def delete_shipment(shipment_id: UUID, repo: ShipmentRepository = Depends(get_shipment_repository)):
-    repo.delete(shipment_id)
+    await resolve(repo.delete(shipment_id))
     return {"detail": "Shipment deleted"}
 
 # CRUD for ScheduleStatus
 @app.post("/statuses/", response_model=ScheduleStatus)
 async def create_status(status: ScheduleStatus, repo: ScheduleStatusRepository = Depends(get_status_repository)):
-    return repo.create(status)
+    return await resolve(repo.create(status))
+
+@app.post("/statuses/bulk", response_model=List[ScheduleStatus])
+async def create_statuses(statuses: List[ScheduleStatus], repo: ScheduleStatusRepository = Depends(get_status_repository)):
+    return await resolve(repo.create_many(statuses))
 
 @app.get("/statuses/", response_model=List[ScheduleStatus])
-async def read_statuses(project_id: UUID, repo: ScheduleStatusRepository = Depends(get_status_repository)):
-    return repo.get_all(project_id)
+async def read_statuses(response: Response, project_id: UUID, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: ScheduleStatusRepository = Depends(get_status_repository)):
+    await check_etag(response, if_none_match, repo.version(project_id))
+    items = await resolve(repo.get_all(project_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "status_id")
 
 @app.get("/statuses/{status_id}", response_model=ScheduleStatus)
-async def read_status(status_id: UUID, repo: ScheduleStatusRepository = Depends(get_status_repository)):
-    return repo.get_by_id(status_id)
+async def read_status(response: Response, status_id: UUID, if_none_match: str = Header(None), repo: ScheduleStatusRepository = Depends(get_status_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(status_id))
 
 @app.put("/statuses/{status_id}", response_model=ScheduleStatus)
 async def update_status(status_id: UUID, updated_status: ScheduleStatus, repo: ScheduleStatusRepository = Depends(get_status_repository)):
-    return repo.update(status_id, updated_status)
+    return await resolve(repo.update(status_id, updated_status))
 
 @app.delete("/statuses/{status_id}")
 async def delete_status(status_id: UUID, repo: ScheduleStatusRepository = Depends(get_status_repository)):
-    repo.delete(status_id)
+    await resolve(repo.delete(status_id))
     return {"detail": "Status deleted"}
 
 # CRUD for TimeReport
 @app.post("/reports/", response_model=TimeReport)
 async def create_report(report: TimeReport, user_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
-    return repo.create(report, user_id)
+    return await resolve(repo.create(report, user_id))
+
+@app.post("/reports/bulk", response_model=List[TimeReport])
+async def create_reports(reports: List[TimeReport], user_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
+    return await resolve(repo.create_many(reports, user_id))
 
 @app.get("/reports/", response_model=List[TimeReport])
-async def read_reports(crew_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
-    return repo.get_all(crew_id)
+async def read_reports(response: Response, crew_id: UUID, stream: bool = False, limit: int = Query(None, ge=1), cursor: str = None, if_none_match: str = Header(None), repo: TimeReportRepository = Depends(get_report_repository)):
+    await check_etag(response, if_none_match, repo.version(crew_id))
+    if stream:
+        return ndjson_response(response, repo.iter_all(crew_id))
+    items = await resolve(repo.get_all(crew_id, limit, decode_cursor(cursor)))
+    return paginate(response, items, limit, "report_id")
 
 @app.get("/reports/{report_id}", response_model=TimeReport)
-async def read_report(report_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
-    return repo.get_by_id(report_id)
+async def read_report(response: Response, report_id: UUID, if_none_match: str = Header(None), repo: TimeReportRepository = Depends(get_report_repository)):
+    await check_etag(response, if_none_match, repo.version())
+    return await resolve(repo.get_by_id(report_id))
 
 @app.put("/reports/{report_id}", response_model=TimeReport)
 async def update_report(report_id: UUID, updated_report: TimeReport, user_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
-    return repo.update(report_id, updated_report, user_id)
+    return await resolve(repo.update(report_id, updated_report, user_id))
 
 @app.delete("/reports/{report_id}")
 async def delete_report(report_id: UUID, repo: TimeReportRepository = Depends(get_report_repository)):
-    repo.delete(report_id)
+    await resolve(repo.delete(report_id))
     return {"detail": "Report deleted"}
 
 if __name__ == "__main__":
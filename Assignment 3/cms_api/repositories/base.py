@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from uuid import UUID
 from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport
 
@@ -8,7 +8,10 @@ class UserRepository(ABC):
     def create(self, user: User) -> User:
         pass
     @abstractmethod
-    def get_all(self) -> List[User]:
+    def create_many(self, users: List[User]) -> List[User]:
+        pass
+    @abstractmethod
+    def get_all(self, limit: int = None, after: UUID = None) -> List[User]:
         pass
     @abstractmethod
     def get_by_id(self, user_id: UUID) -> User:
@@ -19,13 +22,19 @@ class UserRepository(ABC):
     @abstractmethod
     def delete(self, user_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self) -> str:
+        pass
 
 class CrewRepository(ABC):
     @abstractmethod
     def create(self, crew: Crew) -> Crew:
         pass
     @abstractmethod
-    def get_all(self, project_id: UUID = None) -> List[Crew]:
+    def create_many(self, crews: List[Crew]) -> List[Crew]:
+        pass
+    @abstractmethod
+    def get_all(self, project_id: UUID = None, limit: int = None, after: UUID = None) -> List[Crew]:
         pass
     @abstractmethod
     def get_by_id(self, crew_id: UUID) -> Crew:
@@ -36,13 +45,19 @@ class CrewRepository(ABC):
     @abstractmethod
     def delete(self, crew_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self, project_id: UUID = None) -> str:
+        pass
 
 class ProjectRepository(ABC):
     @abstractmethod
     def create(self, project: Project) -> Project:
         pass
     @abstractmethod
-    def get_all(self) -> List[Project]:
+    def create_many(self, projects: List[Project]) -> List[Project]:
+        pass
+    @abstractmethod
+    def get_all(self, limit: int = None, after: UUID = None) -> List[Project]:
         pass
     @abstractmethod
     def get_by_id(self, project_id: UUID) -> Project:
@@ -53,13 +68,22 @@ class ProjectRepository(ABC):
     @abstractmethod
     def delete(self, project_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self) -> str:
+        pass
 
 class PerformanceMetricRepository(ABC):
     @abstractmethod
     def create(self, metric: PerformanceMetric) -> PerformanceMetric:
         pass
     @abstractmethod
-    def get_all(self, crew_id: UUID) -> List[PerformanceMetric]:
+    def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        pass
+    @abstractmethod
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        pass
+    @abstractmethod
+    def iter_all(self, crew_id: UUID) -> Iterator[PerformanceMetric]:
         pass
     @abstractmethod
     def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
@@ -70,13 +94,19 @@ class PerformanceMetricRepository(ABC):
     @abstractmethod
     def delete(self, metric_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self, crew_id: UUID = None) -> str:
+        pass
 
 class ActivityRepository(ABC):
     @abstractmethod
     def create(self, activity: Activity) -> Activity:
         pass
     @abstractmethod
-    def get_all(self, project_id: UUID) -> List[Activity]:
+    def create_many(self, activities: List[Activity]) -> List[Activity]:
+        pass
+    @abstractmethod
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Activity]:
         pass
     @abstractmethod
     def get_by_id(self, activity_id: UUID) -> Activity:
@@ -87,13 +117,19 @@ class ActivityRepository(ABC):
     @abstractmethod
     def delete(self, activity_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self, project_id: UUID = None) -> str:
+        pass
 
 class ShipmentRepository(ABC):
     @abstractmethod
     def create(self, shipment: Shipment) -> Shipment:
         pass
     @abstractmethod
-    def get_all(self, project_id: UUID) -> List[Shipment]:
+    def create_many(self, shipments: List[Shipment]) -> List[Shipment]:
+        pass
+    @abstractmethod
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Shipment]:
         pass
     @abstractmethod
     def get_by_id(self, shipment_id: UUID) -> Shipment:
@@ -104,13 +140,19 @@ class ShipmentRepository(ABC):
     @abstractmethod
     def delete(self, shipment_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self, project_id: UUID = None) -> str:
+        pass
 
 class ScheduleStatusRepository(ABC):
     @abstractmethod
     def create(self, status: ScheduleStatus) -> ScheduleStatus:
         pass
     @abstractmethod
-    def get_all(self, project_id: UUID) -> List[ScheduleStatus]:
+    def create_many(self, statuses: List[ScheduleStatus]) -> List[ScheduleStatus]:
+        pass
+    @abstractmethod
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[ScheduleStatus]:
         pass
     @abstractmethod
     def get_by_id(self, status_id: UUID) -> ScheduleStatus:
@@ -121,13 +163,22 @@ class ScheduleStatusRepository(ABC):
     @abstractmethod
     def delete(self, status_id: UUID) -> None:
         pass
+    @abstractmethod
+    def version(self, project_id: UUID = None) -> str:
+        pass
 
 class TimeReportRepository(ABC):
     @abstractmethod
     def create(self, report: TimeReport, user_id: UUID) -> TimeReport:
         pass
     @abstractmethod
-    def get_all(self, crew_id: UUID) -> List[TimeReport]:
+    def create_many(self, reports: List[TimeReport], user_id: UUID) -> List[TimeReport]:
+        pass
+    @abstractmethod
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[TimeReport]:
+        pass
+    @abstractmethod
+    def iter_all(self, crew_id: UUID) -> Iterator[TimeReport]:
         pass
     @abstractmethod
     def get_by_id(self, report_id: UUID) -> TimeReport:
@@ -137,4 +188,7 @@ class TimeReportRepository(ABC):
         pass
     @abstractmethod
     def delete(self, report_id: UUID) -> None:
+        pass
+    @abstractmethod
+    def version(self, crew_id: UUID = None) -> str:
         pass
\ No newline at end of file
@@ -0,0 +1,19 @@
+from enum import Enum
+from uuid import UUID
+
+# Helpers for building models from column-oriented storage (pandas frames,
+# Arrow tables) without walking rows one field at a time.
+
+def convert_values(values: list, annotation) -> list:
+    if annotation is UUID or (isinstance(annotation, type) and issubclass(annotation, Enum)):
+        # Ids and enum values repeat heavily; convert each distinct value once.
+        converted = {value: annotation(value) for value in set(values)}
+        return [converted[value] for value in values]
+    return values
+
+def construct_models(model, columns: dict) -> list:
+    # Rows come from our own storage, so build trusted models without
+    # re-validating each one.
+    names = list(columns)
+    construct = model.model_construct
+    return [construct(**dict(zip(names, values))) for values in zip(*columns.values())]
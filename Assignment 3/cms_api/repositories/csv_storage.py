@@ -0,0 +1,739 @@
+import csv
+import io
+import os
+import threading
+from collections import namedtuple
+from datetime import date
+from enum import Enum
+from uuid import UUID
+import pandas as pd
+from .columnar import convert_values, construct_models
+from .versions import signature_tag
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Shared, process-wide handles on the CSV files behind the CSV repositories.
+# Repositories are constructed per request, so anything worth keeping between
+# requests (parsed frames, locks, offset indexes) lives here, keyed by
+# absolute file path.
+
+# Sidecar index layout: a fixed-width header recording the (mtime_ns, size)
+# of the CSV it describes, then one "<key> <offset> <length>" line per row.
+INDEX_HEADER = "{:020d} {:020d}\n"
+INDEX_HEADER_SIZE = len(INDEX_HEADER.format(0, 0))
+
+# Updates and deletes are appended to a <file>.csv.log change log as
+# "U,<key>,<row...>" and "D,<key>" records that readers merge on the fly.
+# Once the log passes this size it is folded back into the CSV in a
+# background thread.
+COMPACT_THRESHOLD_BYTES = 1 << 20
+
+# Rows per chunk when streaming a filtered scan instead of loading the file.
+CHUNK_ROWS = 50_000
+
+# A partitioned table's directory also holds a "<key> <partition value>" line
+# per row written, so a lookup by id opens only the row's partition. Later
+# lines win; partition values never start with "." (see partition_path).
+KEYS_NAME = ".keys"
+
+class FileLock:
+    # A lock shared by every thread of every process working on a file: a
+    # thread lock for this process, plus an OS lock on a <file>.lock sidecar
+    # held while any of its threads is inside. Re-entrant, like the RLock it
+    # replaces, so table methods can call each other with it held.
+    def __init__(self, path: str):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self.file = open(self.path, "a+b")
+                lock_file(self.file)
+            except BaseException:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            try:
+                unlock_file(self.file)
+            finally:
+                self.file.close()
+                self.file = None
+        self.thread_lock.release()
+
+def lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    # msvcrt locks a byte range and gives up after ten one-second retries.
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+def unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class OffsetIndex:
+    def __init__(self, signature: tuple, header: list, key: str, offsets: dict):
+        self.signature = signature
+        self.row_type = namedtuple("Row", header, rename=True)
+        self.key_pos = header.index(key)
+        self.offsets = offsets  # key -> (offset, length)
+
+    def parse(self, record: bytes):
+        return self.row_type._make(next(csv.reader([record.decode("utf-8")])))
+
+    def parse_key(self, record: bytes) -> str:
+        if self.key_pos == 0 and not record.startswith(b'"'):
+            return record.split(b",", 1)[0].decode("utf-8")
+        return self.parse(record)[self.key_pos]
+
+class CSVTable:
+    def __init__(self, file_path: str, columns: list, key: str, model):
+        self.file_path = file_path
+        self.index_path = file_path + ".idx"
+        self.log_path = file_path + ".log"
+        self.columns = columns
+        self.key = key
+        self.row_type = namedtuple("Row", columns)
+        self.model = model
+        # Column dtypes come from the model, so ids and text stay strings and
+        # numbers and dates are parsed once, by pandas, at read time.
+        self.fields = {name: field.annotation for name, field in model.model_fields.items()}
+        self.dates = [name for name, annotation in self.fields.items() if annotation is date]
+        self.dtypes = {name: column_dtype(annotation) for name, annotation in self.fields.items() if annotation is not date}
+        self.read_options = {"dtype": self.dtypes, "keep_default_na": False, "parse_dates": self.dates, "date_format": "%Y-%m-%d"}
+        self.compact_threshold = COMPACT_THRESHOLD_BYTES
+        # Uvicorn workers are separate processes appending to the same files,
+        # so writers serialize on a lock the OS shares between them.
+        self.lock = FileLock(file_path + ".lock")
+        self._frame = None  # (signature, frame) for the CSV alone
+        self._cached = None  # ((signature, log signature), merged frame)
+        self._index = None
+        self._log = None  # (log signature, changes)
+        self._compacting = False
+        if not os.path.exists(self.file_path):
+            pd.DataFrame(columns=columns).to_csv(self.file_path, index=False)
+
+    def signature(self) -> tuple:
+        stat = os.stat(self.file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def log_signature(self):
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def version(self, value: str = None) -> str:
+        # Changes with every write to the CSV or its change log, from any
+        # process, for the cost of two stats.
+        return signature_tag((self.signature(), self.log_signature()))
+
+    def read(self) -> pd.DataFrame:
+        # The returned frame is shared between callers; copy before mutating it.
+        signature = (self.signature(), self.log_signature())
+        cached = self._cached
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        # Read the log before the CSV: compaction replaces the CSV before it
+        # removes the log, and an old log merged onto a compacted CSV is harmless.
+        changes = self.changes()
+        frame = self._merge(self._read_main(signature[0]), changes)
+        self._cached = (signature, frame)
+        return frame
+
+    def _read_main(self, signature: tuple) -> pd.DataFrame:
+        cached = self._frame
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        frame = pd.read_csv(self.file_path, **self.read_options)
+        self._frame = (signature, frame)
+        return frame
+
+    def _merge(self, frame: pd.DataFrame, changes: dict) -> pd.DataFrame:
+        if not changes:
+            return frame
+        merged = frame[~frame[self.key].astype(str).isin(changes.keys())]
+        rows = [row for row in changes.values() if row is not None]
+        if rows:
+            extra = pd.DataFrame(rows, columns=self.columns).astype(frame.dtypes.to_dict())
+            merged = pd.concat([merged, extra], ignore_index=True)
+        return merged
+
+    def select(self, column: str, value: str) -> pd.DataFrame:
+        frame = self.read()
+        return frame[frame[column] == value]
+
+    def iter_chunks(self, column: str, value: str, chunksize: int = CHUNK_ROWS):
+        # Streams the rows where column == value without loading the whole
+        # file: peak memory is bounded by the chunk size (plus the small log).
+        changes = self.changes()
+        with pd.read_csv(self.file_path, chunksize=chunksize, **self.read_options) as reader:
+            for chunk in reader:
+                if changes:
+                    chunk = chunk[~chunk[self.key].isin(changes.keys())]
+                chunk = chunk[chunk[column] == value]
+                if len(chunk):
+                    yield chunk
+        rows = [row for row in changes.values() if row is not None and getattr(row, column) == value]
+        if rows:
+            yield pd.DataFrame(rows, columns=self.columns).astype(self.dtypes)
+
+    def page(self, frame: pd.DataFrame, limit: int = None, after=None) -> pd.DataFrame:
+        return page_frame(frame, self.key, limit, after)
+
+    def to_models(self, frame: pd.DataFrame) -> list:
+        columns = {name: column_values(frame[name], annotation) for name, annotation in self.fields.items()}
+        return construct_models(self.model, columns)
+
+    def write(self, df: pd.DataFrame) -> None:
+        with self.lock:
+            tmp_path = self.file_path + ".tmp"
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.file_path)
+            self._frame = None
+            self._cached = None
+            self._index = None
+
+    def encode(self, item) -> dict:
+        return encode_row(item, self.columns)
+
+    def append(self, row: dict) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: list) -> None:
+        # One write() for the whole batch under the table lock (held across
+        # worker processes): no re-read and no rewrite, so inserts stay
+        # O(rows) however large the file grows.
+        with self.lock:
+            changes = self.changes()
+            lines = []
+            for row in rows:
+                key = str(row[self.key])
+                if key in changes:
+                    # Re-creating a key the change log has touched: record it
+                    # in the log so it is not masked by the earlier change.
+                    self._append_log("U", key, row)
+                    changes = self.changes()
+                else:
+                    lines.append((key, encode_line([row[column] for column in self.columns])))
+            if not lines:
+                return
+            index = self._index
+            if index is not None and index.signature != self.signature():
+                index = None
+            with open(self.file_path, "a+b") as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                prefix = b""
+                if offset == 0:
+                    prefix = encode_line(self.columns)
+                    index = None
+                else:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        prefix = b"\n"
+                data = prefix + b"".join(line for _, line in lines)
+                f.write(data)
+            # The lock keeps other workers out, but not scripts or editors:
+            # if anything else grew the file meanwhile, the offsets computed
+            # here are wrong, so leave the index to be rebuilt.
+            signature = self.signature()
+            if index is not None and signature[1] == offset + len(data):
+                offset += len(prefix)
+                entries = []
+                for key, line in lines:
+                    entries.append((key, offset, len(line) - 1))
+                    offset += len(line)
+                self._extend_index(index, entries, signature)
+
+    def update(self, key: str, row: dict) -> None:
+        self._append_log("U", key, row)
+
+    def delete(self, key: str) -> None:
+        self._append_log("D", key, None)
+
+    def changes(self) -> dict:
+        # key -> latest row (or None for a tombstone) from the change log.
+        signature = self.log_signature()
+        log = self._log
+        if log is not None and log[0] == signature:
+            return log[1]
+        changes = {}
+        if signature is not None:
+            try:
+                with open(self.log_path, newline="", encoding="utf-8") as f:
+                    for record in csv.reader(f):
+                        if record:
+                            self._apply(changes, record)
+            except FileNotFoundError:
+                # compact() folded the log into the CSV and removed it after
+                # it was stat'ed; look again.
+                return self.changes()
+        self._log = (signature, changes)
+        return changes
+
+    def _apply(self, changes: dict, record: list) -> None:
+        op, key = record[0], record[1]
+        if op == "D":
+            changes[key] = None
+            return
+        row = self.row_type._make(record[2:])
+        new_key = getattr(row, self.key)
+        if new_key != key:
+            changes[key] = None
+        changes[new_key] = row
+
+    def _append_log(self, op: str, key: str, row) -> None:
+        record = [op, key]
+        if row is not None:
+            record += [row[column] for column in self.columns]
+        with self.lock:
+            # Copy-on-write so readers iterating the current changes are unaffected.
+            changes = dict(self.changes())
+            with open(self.log_path, "ab") as f:
+                f.write(encode_line(record))
+            self._apply(changes, [str(value) for value in record])
+            signature = self.log_signature()
+            self._log = (signature, changes)
+            if signature[1] >= self.compact_threshold and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self) -> None:
+        # Fold the change log into the CSV. Until the log is removed, readers
+        # may merge it onto the compacted file; replaying it there is a no-op.
+        try:
+            with self.lock:
+                changes = self.changes()
+                if changes:
+                    raw = pd.read_csv(self.file_path, dtype=str, keep_default_na=False)
+                    self.write(self._merge(raw, changes))
+                    os.remove(self.log_path)
+                    self._log = None
+                self.index()
+        finally:
+            self._compacting = False
+
+    def index(self) -> OffsetIndex:
+        index = self._index
+        if index is not None and index.signature == self.signature():
+            return index
+        with self.lock:
+            signature = self.signature()
+            index = self._load_index(signature) or self._build_index(signature)
+            self._index = index
+            return index
+
+    def lookup(self, key: str):
+        # Seek straight to the row via the offset index and parse one line.
+        changes = self.changes()
+        if key in changes:
+            return changes[key]
+        for _ in range(2):
+            index = self.index()
+            entry = index.offsets.get(key)
+            if entry is None:
+                return None
+            with open(self.file_path, "rb") as f:
+                f.seek(entry[0])
+                record = f.read(entry[1])
+            row = index.parse(record)
+            if row[index.key_pos] == key:
+                return row
+            # The file was rewritten between validating the index and reading it.
+            self._index = None
+        return None
+
+    def contains(self, key: str) -> bool:
+        changes = self.changes()
+        if key in changes:
+            return changes[key] is not None
+        return key in self.index().offsets
+
+    def _header(self) -> list:
+        with open(self.file_path, "rb") as f:
+            for _, record in iter_records(f):
+                return next(csv.reader([record.decode("utf-8")]))
+        return list(self.columns)
+
+    def _load_index(self, signature: tuple):
+        try:
+            with open(self.index_path, "rb") as f:
+                stored = f.read(INDEX_HEADER_SIZE).split()
+                if len(stored) != 2 or (int(stored[0]), int(stored[1])) != signature:
+                    return None
+                offsets = {}
+                for line in f:
+                    key, offset, length = line.split()
+                    offsets.setdefault(key.decode("utf-8"), (int(offset), int(length)))
+        except (OSError, ValueError):
+            return None
+        return OffsetIndex(signature, self._header(), self.key, offsets)
+
+    def _build_index(self, signature: tuple) -> OffsetIndex:
+        index = None
+        with open(self.file_path, "rb") as f:
+            for offset, record in iter_records(f):
+                if index is None:
+                    header = next(csv.reader([record.decode("utf-8")]))
+                    index = OffsetIndex(signature, header, self.key, {})
+                    continue
+                index.offsets.setdefault(index.parse_key(record), (offset, len(record)))
+        if index is None:
+            index = OffsetIndex(signature, list(self.columns), self.key, {})
+        self._save_index(index)
+        return index
+
+    def _save_index(self, index: OffsetIndex) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(INDEX_HEADER.format(*index.signature))
+            for key, (offset, length) in index.offsets.items():
+                f.write(f"{key} {offset} {length}\n")
+        os.replace(tmp_path, self.index_path)
+
+    def _extend_index(self, index: OffsetIndex, entries: list, signature: tuple) -> None:
+        # Append the new (key, offset, length) entries to the sidecar and
+        # rewrite its fixed-width header in place, so the sidecar stays valid
+        # without being rewritten. signature is the CSV's right after the
+        # append that wrote exactly these entries.
+        for key, offset, length in entries:
+            index.offsets.setdefault(key, (offset, length))
+        index.signature = signature
+        try:
+            with open(self.index_path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                f.write("".join(f"{key} {offset} {length}\n" for key, offset, length in entries).encode("utf-8"))
+                f.seek(0)
+                f.write(INDEX_HEADER.format(*index.signature).encode("utf-8"))
+        except OSError:
+            self._save_index(index)
+
+def column_dtype(annotation):
+    if annotation is float:
+        return "float64"
+    if annotation is int:
+        return "int64"
+    return str
+
+def column_values(series: pd.Series, annotation) -> list:
+    if annotation is date:
+        return pd.to_datetime(series, format="%Y-%m-%d").dt.date.tolist()
+    return convert_values(series.tolist(), annotation)
+
+def iter_records(f):
+    # Yields (offset, record) for each CSV record in a binary file, without
+    # its line terminator. Quoted fields may span several physical lines.
+    offset = 0
+    start = 0
+    pending = b""
+    for line in f:
+        offset += len(line)
+        pending = pending + line if pending else line
+        if pending.count(b'"') % 2:
+            continue
+        record = pending.rstrip(b"\r\n")
+        if record:
+            yield start, record
+        start = offset
+        pending = b""
+
+def page_frame(frame: pd.DataFrame, key: str, limit: int = None, after=None) -> pd.DataFrame:
+    # Keyset page: rows whose key sorts after `after`, in key order. Only the
+    # surviving rows are sorted and only `limit` of them become models.
+    if after is not None:
+        frame = frame[frame[key] > str(after)]
+    if limit is not None or after is not None:
+        frame = frame.sort_values(key, kind="stable").head(limit)
+    return frame
+
+def encode_row(item, columns: list) -> dict:
+    # Model -> CSV row: ids as strings, enums by value, dates as ISO dates.
+    row = {}
+    for column in columns:
+        value = getattr(item, column)
+        if isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, date):
+            value = value.isoformat()
+        row[column] = value
+    return row
+
+def encode_line(values: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+class PartitionedCSVTable:
+    # One CSVTable per value of the partition column, stored as
+    # <directory>/<name>=<value>.csv (e.g. data/activities/project=<id>.csv),
+    # so reads and writes filtered on that column only touch one file, with
+    # its own cache, offset index and change log. Lookups by id go through
+    # the directory's keys sidecar to the one partition holding the row.
+    def __init__(self, directory: str, columns: list, key: str, model, partition_by: str):
+        self.directory = directory
+        self.columns = columns
+        self.key = key
+        self.model = model
+        self.partition_by = partition_by
+        self.prefix = partition_name(partition_by) + "="
+        self.fields = {name: field.annotation for name, field in model.model_fields.items()}
+        self.keys_path = os.path.join(directory, KEYS_NAME)
+        self.lock = FileLock(os.path.join(directory, KEYS_NAME + ".lock"))
+        self._keys = (0, {})  # (bytes of the keys sidecar read, key -> partition value)
+        self._keys_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def partition_path(self, value: str) -> str:
+        if not value or os.sep in value or "/" in value or value.startswith("."):
+            raise ValueError(f"Invalid partition value: {value!r}")
+        return os.path.join(self.directory, f"{self.prefix}{value}.csv")
+
+    def partition(self, value: str, create: bool = False):
+        path = self.partition_path(value)
+        if not create and not os.path.exists(path):
+            return None
+        return get_table(path, self.columns, self.key, self.model)
+
+    def partitions(self) -> list:
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith(self.prefix) and name.endswith(".csv"))
+        return [get_table(os.path.join(self.directory, name), self.columns, self.key, self.model) for name in names]
+
+    def version(self, value: str = None) -> str:
+        # One partition's version, or every partition's for the whole table.
+        if value is not None:
+            table = self.partition(str(value))
+            return "empty" if table is None else table.version()
+        return signature_tag(tuple((table.file_path, table.version()) for table in self.partitions()))
+
+    def find(self, key: str):
+        # Ids are not partition values: the keys sidecar names the partition
+        # a key was last written to, and only that partition's offset index
+        # is asked, which also catches rows deleted since.
+        value = self.keys().get(key)
+        if value is None:
+            return None
+        table = self.partition(value)
+        if table is None or not table.contains(key):
+            return None
+        return table
+
+    def keys(self) -> dict:
+        # key -> partition value. The sidecar is only ever appended to, so
+        # only the lines other workers added since the last call are read.
+        try:
+            size = os.stat(self.keys_path).st_size
+        except FileNotFoundError:
+            self._build_keys()
+            return self.keys()
+        read, keys = self._keys
+        if size == read:
+            return keys
+        with self._keys_lock:
+            read, keys = self._keys
+            if size < read:
+                # The sidecar was rebuilt (see _build_keys); start over.
+                read, keys = 0, {}
+            with open(self.keys_path, "rb") as f:
+                f.seek(read)
+                data = f.read(size - read)
+            # A line another worker is still writing is left for next time.
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                key, value = line.decode("utf-8").split()
+                keys[key] = value
+            self._keys = (read + end, keys)
+            return keys
+
+    def _build_keys(self) -> None:
+        # Directories partitioned before the sidecar existed get one built
+        # from the partitions' offset indexes and change logs.
+        with self.lock:
+            if os.path.exists(self.keys_path):
+                return
+            entries = []
+            for table in self.partitions():
+                value = os.path.basename(table.file_path)[len(self.prefix):-len(".csv")]
+                changes = table.changes()
+                live = [key for key in table.index().offsets if key not in changes]
+                live += [key for key, row in changes.items() if row is not None]
+                entries += [(key, value) for key in live]
+            write_keys(self.keys_path, entries)
+
+    def _record_keys(self, entries: list) -> None:
+        # Called with the lock held, before the rows are written: an entry
+        # for a row that never lands is harmless, since find checks it.
+        self.keys()
+        with open(self.keys_path, "ab") as f:
+            f.write("".join(f"{key} {value}\n" for key, value in entries).encode("utf-8"))
+
+    def empty(self) -> pd.DataFrame:
+        return pd.DataFrame(columns=self.columns)
+
+    def read(self) -> pd.DataFrame:
+        frames = [table.read() for table in self.partitions()]
+        if not frames:
+            return self.empty()
+        return pd.concat(frames, ignore_index=True)
+
+    def select(self, column: str, value: str) -> pd.DataFrame:
+        if column != self.partition_by:
+            frame = self.read()
+            return frame[frame[column] == value]
+        table = self.partition(value)
+        if table is None:
+            return self.empty()
+        return table.read()
+
+    def iter_chunks(self, column: str, value: str, chunksize: int = CHUNK_ROWS):
+        if column == self.partition_by:
+            table = self.partition(value)
+            tables = [] if table is None else [table]
+        else:
+            tables = self.partitions()
+        for table in tables:
+            yield from table.iter_chunks(column, value, chunksize)
+
+    def page(self, frame: pd.DataFrame, limit: int = None, after=None) -> pd.DataFrame:
+        return page_frame(frame, self.key, limit, after)
+
+    def to_models(self, frame: pd.DataFrame) -> list:
+        columns = {name: column_values(frame[name], annotation) for name, annotation in self.fields.items()}
+        return construct_models(self.model, columns)
+
+    def lookup(self, key: str):
+        table = self.find(key)
+        return None if table is None else table.lookup(key)
+
+    def contains(self, key: str) -> bool:
+        return self.find(key) is not None
+
+    def encode(self, item) -> dict:
+        return encode_row(item, self.columns)
+
+    def append(self, row: dict) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: list) -> None:
+        # One append per partition touched.
+        batches = {}
+        for row in rows:
+            batches.setdefault(str(row[self.partition_by]), []).append(row)
+        with self.lock:
+            self._record_keys([(str(row[self.key]), value) for value, batch in batches.items() for row in batch])
+            for value, batch in batches.items():
+                self.partition(value, create=True).append_many(batch)
+
+    def update(self, key: str, row: dict) -> None:
+        with self.lock:
+            table = self.find(key)
+            if table is None:
+                return
+            value = str(row[self.partition_by])
+            target = self.partition(value, create=True)
+            if target is table:
+                table.update(key, row)
+            else:
+                # The partition column changed: move the row to its new file.
+                # It is written there before the sidecar points there, and
+                # removed from the old file only after, so find never misses it.
+                target.append(row)
+                self._record_keys([(key, value)])
+                table.delete(key)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            table = self.find(key)
+            if table is not None:
+                table.delete(key)
+
+def write_keys(path: str, entries) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        for key, value in entries:
+            f.write(f"{key} {value}\n")
+    os.replace(tmp_path, path)
+
+def partition_name(column: str) -> str:
+    return column[:-3] if column.endswith("_id") else column
+
+def partition_directory(file_path: str) -> str:
+    return os.path.splitext(file_path)[0]
+
+def partition_csv(file_path: str, columns: list, key: str, model, partition_by: str) -> int:
+    # Splits an existing single-file table (plus any pending change log) into
+    # one file per partition value, then moves the original aside so the
+    # repositories pick up the partitioned layout. Returns the partition count.
+    directory = partition_directory(file_path)
+    if os.path.isdir(directory):
+        raise FileExistsError(f"{directory} is already partitioned")
+    source = CSVTable(file_path, columns, key, model)
+    if partition_by not in source._header():
+        raise ValueError(f"{file_path} has no {partition_by} column")
+    with source.lock:
+        frame = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        frame = source._merge(frame, source.changes())
+        tmp_directory = directory + ".tmp"
+        os.makedirs(tmp_directory, exist_ok=True)
+        prefix = partition_name(partition_by) + "="
+        groups = frame.groupby(partition_by, sort=False)
+        for value, group in groups:
+            group.to_csv(os.path.join(tmp_directory, f"{prefix}{value}.csv"), index=False, columns=columns)
+        write_keys(os.path.join(tmp_directory, KEYS_NAME), zip(frame[key], frame[partition_by]))
+        os.replace(tmp_directory, directory)
+        os.replace(file_path, file_path + ".migrated")
+        for path in (source.index_path, source.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+    with _tables_lock:
+        _tables.pop(os.path.abspath(file_path), None)
+    return groups.ngroups
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+def get_table(file_path: str, columns: list, key: str, model, partition_by: str = None):
+    # Tables with a partition column switch to the partitioned layout as soon
+    # as its directory exists (see partition_csv).
+    path = os.path.abspath(file_path)
+    if partition_by is not None and os.path.isdir(partition_directory(path)):
+        path = partition_directory(path)
+    table = _tables.get(path)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(path)
+            if table is None:
+                if path != os.path.abspath(file_path):
+                    table = PartitionedCSVTable(path, columns, key, model, partition_by)
+                else:
+                    table = CSVTable(file_path, columns, key, model)
+                _tables[path] = table
+    return table
@@ -1,233 +1,326 @@
 from uuid import UUID
-from typing import List
+from typing import Iterator, List
 from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport, Role
 from .base import UserRepository, CrewRepository, ProjectRepository, PerformanceMetricRepository, ActivityRepository, ShipmentRepository, ScheduleStatusRepository, TimeReportRepository
+from .memory_storage import get_table, get_columnar_table
+from .role_cache import roles, check_foreman
+from .versions import versions
 from fastapi import HTTPException
 
 class InMemoryUserRepository(UserRepository):
     def __init__(self):
-        self.users = {}
+        self.table = get_table("users")
 
     def create(self, user: User) -> User:
-        self.users[str(user.user_id)] = user
+        self.table.put(str(user.user_id), user)
+        roles.invalidate(user.user_id)
+        versions.bump("users")
         return user
 
-    def get_all(self) -> List[User]:
-        return list(self.users.values())
+    def create_many(self, users: List[User]) -> List[User]:
+        self.table.put_many([(str(user.user_id), user) for user in users])
+        roles.invalidate(*(user.user_id for user in users))
+        versions.bump("users")
+        return users
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[User]:
+        return self.table.all(limit, after)
 
     def get_by_id(self, user_id: UUID) -> User:
-        user = self.users.get(str(user_id))
+        user = self.table.get(str(user_id))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
 
     def update(self, user_id: UUID, updated_user: User) -> User:
-        if str(user_id) not in self.users:
+        if not self.table.replace(str(user_id), updated_user):
             raise HTTPException(status_code=404, detail="User not found")
-        self.users[str(user_id)] = updated_user
+        roles.invalidate(user_id, updated_user.user_id)
+        versions.bump("users")
         return updated_user
 
     def delete(self, user_id: UUID) -> None:
-        if str(user_id) not in self.users:
+        if not self.table.remove(str(user_id)):
             raise HTTPException(status_code=404, detail="User not found")
-        del self.users[str(user_id)]
+        roles.invalidate(user_id)
+        versions.bump("users")
+
+    def version(self) -> str:
+        return versions.tag("users")
 
 class InMemoryCrewRepository(CrewRepository):
     def __init__(self):
-        self.crews = {}
+        self.table = get_table("crews", "project_id")
 
     def create(self, crew: Crew) -> Crew:
-        self.crews[str(crew.crew_id)] = crew
+        self.table.put(str(crew.crew_id), crew)
+        versions.bump("crews", crew.project_id)
         return crew
 
-    def get_all(self, project_id: UUID = None) -> List[Crew]:
+    def create_many(self, crews: List[Crew]) -> List[Crew]:
+        self.table.put_many([(str(crew.crew_id), crew) for crew in crews])
+        versions.bump("crews", *{crew.project_id for crew in crews})
+        return crews
+
+    def get_all(self, project_id: UUID = None, limit: int = None, after: UUID = None) -> List[Crew]:
         if project_id:
-            return [crew for crew in self.crews.values() if crew.project_id == project_id]
-        return list(self.crews.values())
+            return self.table.select(project_id, limit, after)
+        return self.table.all(limit, after)
 
     def get_by_id(self, crew_id: UUID) -> Crew:
-        crew = self.crews.get(str(crew_id))
+        crew = self.table.get(str(crew_id))
         if not crew:
             raise HTTPException(status_code=404, detail="Crew not found")
         return crew
 
     def update(self, crew_id: UUID, updated_crew: Crew) -> Crew:
-        if str(crew_id) not in self.crews:
+        if not self.table.replace(str(crew_id), updated_crew):
             raise HTTPException(status_code=404, detail="Crew not found")
-        self.crews[str(crew_id)] = updated_crew
+        versions.bump("crews")
         return updated_crew
 
     def delete(self, crew_id: UUID) -> None:
-        if str(crew_id) not in self.crews:
+        if not self.table.remove(str(crew_id)):
             raise HTTPException(status_code=404, detail="Crew not found")
-        del self.crews[str(crew_id)]
+        versions.bump("crews")
+
+    def version(self, project_id: UUID = None) -> str:
+        return versions.tag("crews", project_id)
 
 class InMemoryProjectRepository(ProjectRepository):
     def __init__(self):
-        self.projects = {}
+        self.table = get_table("projects")
 
     def create(self, project: Project) -> Project:
-        self.projects[str(project.project_id)] = project
+        self.table.put(str(project.project_id), project)
+        versions.bump("projects")
         return project
 
-    def get_all(self) -> List[Project]:
-        return list(self.projects.values())
+    def create_many(self, projects: List[Project]) -> List[Project]:
+        self.table.put_many([(str(project.project_id), project) for project in projects])
+        versions.bump("projects")
+        return projects
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[Project]:
+        return self.table.all(limit, after)
 
     def get_by_id(self, project_id: UUID) -> Project:
-        project = self.projects.get(str(project_id))
+        project = self.table.get(str(project_id))
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         return project
 
     def update(self, project_id: UUID, updated_project: Project) -> Project:
-        if str(project_id) not in self.projects:
+        if not self.table.replace(str(project_id), updated_project):
             raise HTTPException(status_code=404, detail="Project not found")
-        self.projects[str(project_id)] = updated_project
+        versions.bump("projects")
         return updated_project
 
     def delete(self, project_id: UUID) -> None:
-        if str(project_id) not in self.projects:
+        if not self.table.remove(str(project_id)):
             raise HTTPException(status_code=404, detail="Project not found")
-        del self.projects[str(project_id)]
+        versions.bump("projects")
+
+    def version(self) -> str:
+        return versions.tag("projects")
 
 class InMemoryPerformanceMetricRepository(PerformanceMetricRepository):
     def __init__(self):
-        self.metrics = {}
+        self.table = get_columnar_table("metrics", PerformanceMetric, "metric_id", "crew_id")
 
     def create(self, metric: PerformanceMetric) -> PerformanceMetric:
-        self.metrics[str(metric.metric_id)] = metric
+        self.table.put(str(metric.metric_id), metric)
+        versions.bump("metrics", metric.crew_id)
         return metric
 
-    def get_all(self, crew_id: UUID) -> List[PerformanceMetric]:
-        return [metric for metric in self.metrics.values() if metric.crew_id == crew_id]
+    def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        self.table.put_many([(str(metric.metric_id), metric) for metric in metrics])
+        versions.bump("metrics", *{metric.crew_id for metric in metrics})
+        return metrics
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        return self.table.select(crew_id, limit, after)
+
+    def iter_all(self, crew_id: UUID) -> Iterator[PerformanceMetric]:
+        yield from self.get_all(crew_id)
 
     def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
-        metric = self.metrics.get(str(metric_id))
+        metric = self.table.get(str(metric_id))
         if not metric:
             raise HTTPException(status_code=404, detail="Metric not found")
         return metric
 
     def update(self, metric_id: UUID, updated_metric: PerformanceMetric) -> PerformanceMetric:
-        if str(metric_id) not in self.metrics:
+        if not self.table.replace(str(metric_id), updated_metric):
             raise HTTPException(status_code=404, detail="Metric not found")
-        self.metrics[str(metric_id)] = updated_metric
+        versions.bump("metrics")
         return updated_metric
 
     def delete(self, metric_id: UUID) -> None:
-        if str(metric_id) not in self.metrics:
+        if not self.table.remove(str(metric_id)):
             raise HTTPException(status_code=404, detail="Metric not found")
-        del self.metrics[str(metric_id)]
+        versions.bump("metrics")
+
+    def version(self, crew_id: UUID = None) -> str:
+        return versions.tag("metrics", crew_id)
 
 class InMemoryActivityRepository(ActivityRepository):
     def __init__(self):
-        self.activities = {}
+        self.table = get_table("activities", "project_id")
 
     def create(self, activity: Activity) -> Activity:
-        self.activities[str(activity.activity_id)] = activity
+        self.table.put(str(activity.activity_id), activity)
+        versions.bump("activities", activity.project_id)
         return activity
 
-    def get_all(self, project_id: UUID) -> List[Activity]:
-        return [activity for activity in self.activities.values() if activity.project_id == project_id]
+    def create_many(self, activities: List[Activity]) -> List[Activity]:
+        self.table.put_many([(str(activity.activity_id), activity) for activity in activities])
+        versions.bump("activities", *{activity.project_id for activity in activities})
+        return activities
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Activity]:
+        return self.table.select(project_id, limit, after)
 
     def get_by_id(self, activity_id: UUID) -> Activity:
-        activity = self.activities.get(str(activity_id))
+        activity = self.table.get(str(activity_id))
         if not activity:
             raise HTTPException(status_code=404, detail="Activity not found")
         return activity
 
     def update(self, activity_id: UUID, updated_activity: Activity) -> Activity:
-        if str(activity_id) not in self.activities:
+        if not self.table.replace(str(activity_id), updated_activity):
             raise HTTPException(status_code=404, detail="Activity not found")
-        self.activities[str(activity_id)] = updated_activity
+        versions.bump("activities")
         return updated_activity
 
     def delete(self, activity_id: UUID) -> None:
-        if str(activity_id) not in self.activities:
+        if not self.table.remove(str(activity_id)):
             raise HTTPException(status_code=404, detail="Activity not found")
-        del self.activities[str(activity_id)]
+        versions.bump("activities")
+
+    def version(self, project_id: UUID = None) -> str:
+        return versions.tag("activities", project_id)
 
 class InMemoryShipmentRepository(ShipmentRepository):
     def __init__(self):
-        self.shipments = {}
+        self.table = get_table("shipments", "project_id")
 
     def create(self, shipment: Shipment) -> Shipment:
-        self.shipments[str(shipment.shipment_id)] = shipment
+        self.table.put(str(shipment.shipment_id), shipment)
+        versions.bump("shipments", shipment.project_id)
         return shipment
 
-    def get_all(self, project_id: UUID) -> List[Shipment]:
-        return [shipment for shipment in self.shipments.values() if shipment.project_id == project_id]
+    def create_many(self, shipments: List[Shipment]) -> List[Shipment]:
+        self.table.put_many([(str(shipment.shipment_id), shipment) for shipment in shipments])
+        versions.bump("shipments", *{shipment.project_id for shipment in shipments})
+        return shipments
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Shipment]:
+        return self.table.select(project_id, limit, after)
 
     def get_by_id(self, shipment_id: UUID) -> Shipment:
-        shipment = self.shipments.get(str(shipment_id))
+        shipment = self.table.get(str(shipment_id))
         if not shipment:
             raise HTTPException(status_code=404, detail="Shipment not found")
         return shipment
 
     def update(self, shipment_id: UUID, updated_shipment: Shipment) -> Shipment:
-        if str(shipment_id) not in self.shipments:
+        if not self.table.replace(str(shipment_id), updated_shipment):
             raise HTTPException(status_code=404, detail="Shipment not found")
-        self.shipments[str(shipment_id)] = updated_shipment
+        versions.bump("shipments")
         return updated_shipment
 
     def delete(self, shipment_id: UUID) -> None:
-        if str(shipment_id) not in self.shipments:
+        if not self.table.remove(str(shipment_id)):
             raise HTTPException(status_code=404, detail="Shipment not found")
-        del self.shipments[str(shipment_id)]
+        versions.bump("shipments")
+
+    def version(self, project_id: UUID = None) -> str:
+        return versions.tag("shipments", project_id)
 
 class InMemoryScheduleStatusRepository(ScheduleStatusRepository):
     def __init__(self):
-        self.statuses = {}
+        self.table = get_table("statuses", "project_id")
 
     def create(self, status: ScheduleStatus) -> ScheduleStatus:
-        self.statuses[str(status.status_id)] = status
+        self.table.put(str(status.status_id), status)
+        versions.bump("statuses", status.project_id)
         return status
 
-    def get_all(self, project_id: UUID) -> List[ScheduleStatus]:
-        return [status for status in self.statuses.values() if status.project_id == project_id]
+    def create_many(self, statuses: List[ScheduleStatus]) -> List[ScheduleStatus]:
+        self.table.put_many([(str(status.status_id), status) for status in statuses])
+        versions.bump("statuses", *{status.project_id for status in statuses})
+        return statuses
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[ScheduleStatus]:
+        return self.table.select(project_id, limit, after)
 
     def get_by_id(self, status_id: UUID) -> ScheduleStatus:
-        status = self.statuses.get(str(status_id))
+        status = self.table.get(str(status_id))
         if not status:
             raise HTTPException(status_code=404, detail="Status not found")
         return status
 
     def update(self, status_id: UUID, updated_status: ScheduleStatus) -> ScheduleStatus:
-        if str(status_id) not in self.statuses:
+        if not self.table.replace(str(status_id), updated_status):
             raise HTTPException(status_code=404, detail="Status not found")
-        self.statuses[str(status_id)] = updated_status
+        versions.bump("statuses")
         return updated_status
 
     def delete(self, status_id: UUID) -> None:
-        if str(status_id) not in self.statuses:
+        if not self.table.remove(str(status_id)):
             raise HTTPException(status_code=404, detail="Status not found")
-        del self.statuses[str(status_id)]
+        versions.bump("statuses")
+
+    def version(self, project_id: UUID = None) -> str:
+        return versions.tag("statuses", project_id)
 
 class InMemoryTimeReportRepository(TimeReportRepository):
     def __init__(self):
-        self.reports = {}
+        self.table = get_columnar_table("reports", TimeReport, "report_id", "crew_id")
+        self.users = get_table("users")
+
+    def load_role(self, user_id: str):
+        user = self.users.get(user_id)
+        return user.role if user else None
 
     def create(self, report: TimeReport, user_id: UUID) -> TimeReport:
-        # Foreman check requires UserRepository; assume external validation
-        self.reports[str(report.report_id)] = report
+        check_foreman(user_id, self.load_role, "submit")
+        self.table.put(str(report.report_id), report)
+        versions.bump("reports", report.crew_id)
         return report
 
-    def get_all(self, crew_id: UUID) -> List[TimeReport]:
-        return [report for report in self.reports.values() if report.crew_id == crew_id]
+    def create_many(self, reports: List[TimeReport], user_id: UUID) -> List[TimeReport]:
+        check_foreman(user_id, self.load_role, "submit")
+        self.table.put_many([(str(report.report_id), report) for report in reports])
+        versions.bump("reports", *{report.crew_id for report in reports})
+        return reports
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[TimeReport]:
+        return self.table.select(crew_id, limit, after)
+
+    def iter_all(self, crew_id: UUID) -> Iterator[TimeReport]:
+        yield from self.get_all(crew_id)
 
     def get_by_id(self, report_id: UUID) -> TimeReport:
-        report = self.reports.get(str(report_id))
+        report = self.table.get(str(report_id))
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         return report
 
     def update(self, report_id: UUID, updated_report: TimeReport, user_id: UUID) -> TimeReport:
-        # Foreman check requires UserRepository; assume external validation
-        if str(report_id) not in self.reports:
+        if not self.table.contains(str(report_id)):
             raise HTTPException(status_code=404, detail="Report not found")
-        self.reports[str(report_id)] = updated_report
+        check_foreman(user_id, self.load_role, "update")
+        if not self.table.replace(str(report_id), updated_report):
+            raise HTTPException(status_code=404, detail="Report not found")
+        versions.bump("reports")
         return updated_report
 
     def delete(self, report_id: UUID) -> None:
-        if str(report_id) not in self.reports:
+        if not self.table.remove(str(report_id)):
             raise HTTPException(status_code=404, detail="Report not found")
-        del self.reports[str(report_id)]
\ No newline at end of file
+        versions.bump("reports")
+
+    def version(self, crew_id: UUID = None) -> str:
+        return versions.tag("reports", crew_id)
@@ -0,0 +1,570 @@
+import heapq
+import os
+import pickle
+import threading
+from array import array
+from datetime import date
+from enum import Enum
+from uuid import UUID
+from .columnar import construct_models
+
+# Shared, process-wide tables behind the in-memory repositories. Repositories
+# are constructed per request, so the rows live here, keyed by table name,
+# and survive for the life of the process.
+#
+# Sync endpoints run in FastAPI's threadpool, so every table is shared between
+# threads. Writers serialize on the table's lock. Readers never take it: each
+# read starts from a single C-level copy (list(dict.values()), tuple(dict),
+# list(array)), which the GIL makes atomic, and works on that snapshot while
+# writers carry on.
+
+class MemoryTable:
+    def __init__(self, name: str, index_by: str = None):
+        self.name = name
+        self.index_by = index_by
+        self.rows = {}  # key -> model
+        # Secondary hash index: index_by value -> {key: None}, an insertion
+        # ordered set, so filtered listings cost O(result) instead of a scan.
+        self.index = {}
+        self.lock = threading.Lock()
+        self.journal = None
+
+    def spec(self) -> tuple:
+        return ("memory", self.index_by)
+
+    def dump(self) -> dict:
+        # Called with the lock held; the models themselves are never mutated.
+        return dict(self.rows)
+
+    def load(self, rows: dict) -> None:
+        for key, item in rows.items():
+            self._put(key, item)
+
+    def all(self, limit: int = None, after=None) -> list:
+        if limit is None and after is None:
+            return list(self.rows.values())
+        rows = self.rows
+        return [item for item in map(rows.get, page_keys(tuple(rows), limit, after)) if item is not None]
+
+    def select(self, value, limit: int = None, after=None) -> list:
+        # A row may be moved or deleted between the snapshot and the lookup,
+        # so re-check each one rather than trusting the index.
+        keys = tuple(self.index.get(value, ()))
+        if limit is not None or after is not None:
+            keys = page_keys(keys, limit, after)
+        rows = self.rows
+        index_by = self.index_by
+        items = []
+        for key in keys:
+            item = rows.get(key)
+            if item is not None and getattr(item, index_by) == value:
+                items.append(item)
+        return items
+
+    def get(self, key: str):
+        return self.rows.get(key)
+
+    def contains(self, key: str) -> bool:
+        return key in self.rows
+
+    def put(self, key: str, item) -> None:
+        with self.lock:
+            self._put(key, item)
+            if self.journal is not None:
+                self.journal.write(self, "put", key, item)
+
+    def put_many(self, items: list) -> None:
+        # items: [(key, item), ...], inserted under one lock acquisition and
+        # journaled as a single record.
+        with self.lock:
+            for key, item in items:
+                self._put(key, item)
+            if self.journal is not None:
+                self.journal.write(self, "put_many", None, items)
+
+    def _put(self, key: str, item) -> None:
+        old = self.rows.get(key)
+        if old is not None:
+            self._unindex(key, old)
+        self.rows[key] = item
+        if self.index_by is not None:
+            self.index.setdefault(getattr(item, self.index_by), {})[key] = None
+
+    def replace(self, key: str, item) -> bool:
+        with self.lock:
+            if key not in self.rows:
+                return False
+            self._put(key, item)
+            if self.journal is not None:
+                self.journal.write(self, "put", key, item)
+            return True
+
+    def remove(self, key: str) -> bool:
+        with self.lock:
+            item = self.rows.pop(key, None)
+            if item is None:
+                return False
+            self._unindex(key, item)
+            if self.journal is not None:
+                self.journal.write(self, "remove", key, None)
+            return True
+
+    def _unindex(self, key: str, item) -> None:
+        if self.index_by is None:
+            return
+        value = getattr(item, self.index_by)
+        keys = self.index.get(value)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self.index[value]
+
+# Columnar layout for the high-volume tables (metrics, time reports): one
+# flat array per field instead of a model object per row. The key is held as
+# two 64-bit halves of the UUID's 128-bit int; UUIDs, enums and strings that
+# repeat (crew ids, member names, tasks) are stored once and referenced by a
+# 4-byte code; dates are day ordinals. Models are only built when rows are
+# read out.
+#
+# Rows are append-only: an update appends the new version and tombstones the
+# old one, a delete only clears its live flag. Dead rows are dropped when
+# they make up half the table.
+COMPACT_MIN_ROWS = 1024
+
+class KeyColumn:
+    def __init__(self):
+        self.high = array("Q")
+        self.low = array("Q")
+
+    def append(self, value: UUID) -> None:
+        self.high.append(value.int >> 64)
+        self.low.append(value.int & 0xFFFFFFFFFFFFFFFF)
+
+    def copy(self):
+        column = KeyColumn()
+        column.high, column.low = self.high[:], self.low[:]
+        return column
+
+    def take(self, positions: list) -> list:
+        high, low = self.high, self.low
+        return [UUID(int=high[p] << 64 | low[p]) for p in positions]
+
+    def ints(self, positions: list) -> list:
+        high, low = self.high, self.low
+        return [high[p] << 64 | low[p] for p in positions]
+
+class CodeColumn:
+    def __init__(self):
+        self.codes = array("I")
+        self.values = []
+        self.lookup = {}
+
+    def append(self, value) -> None:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def copy(self):
+        column = CodeColumn()
+        column.codes, column.values = self.codes[:], list(self.values)
+        column.lookup = dict(self.lookup)
+        return column
+
+    def __getstate__(self):
+        return (self.codes, self.values)
+
+    def __setstate__(self, state):
+        self.codes, self.values = state
+        self.lookup = {value: code for code, value in enumerate(self.values)}
+
+    def take(self, positions: list) -> list:
+        codes, values = self.codes, self.values
+        return [values[codes[p]] for p in positions]
+
+class DateColumn:
+    def __init__(self):
+        self.days = array("i")
+
+    def append(self, value: date) -> None:
+        self.days.append(value.toordinal())
+
+    def copy(self):
+        column = DateColumn()
+        column.days = self.days[:]
+        return column
+
+    def take(self, positions: list) -> list:
+        days = self.days
+        dates = {}
+        result = []
+        for p in positions:
+            day = days[p]
+            value = dates.get(day)
+            if value is None:
+                value = dates[day] = date.fromordinal(day)
+            result.append(value)
+        return result
+
+class NumberColumn:
+    def __init__(self, typecode: str, values: array = None):
+        self.values = array(typecode) if values is None else values
+
+    def append(self, value) -> None:
+        self.values.append(value)
+
+    def copy(self):
+        return NumberColumn(self.values.typecode, self.values[:])
+
+    def take(self, positions: list) -> list:
+        values = self.values
+        return [values[p] for p in positions]
+
+def new_column(annotation):
+    if annotation is date:
+        return DateColumn()
+    if annotation is float:
+        return NumberColumn("d")
+    if annotation is int:
+        return NumberColumn("q")
+    if annotation is UUID or annotation is str or (isinstance(annotation, type) and issubclass(annotation, Enum)):
+        return CodeColumn()
+    raise TypeError(f"Unsupported column type: {annotation}")
+
+class ColumnarState:
+    def __init__(self, columns: dict):
+        self.columns = columns
+        self.live = bytearray()
+        self.positions = {}  # key as 128-bit int -> row position
+        self.index = {}  # index_by value -> array of row positions
+        self.dead = 0
+
+    def copy(self):
+        state = ColumnarState({name: column.copy() for name, column in self.columns.items()})
+        state.live = bytearray(self.live)
+        state.positions = dict(self.positions)
+        state.index = {value: positions[:] for value, positions in self.index.items()}
+        state.dead = self.dead
+        return state
+
+class ColumnarTable:
+    def __init__(self, name: str, model, key: str, index_by: str = None):
+        self.name = name
+        self.model = model
+        self.key = key
+        self.index_by = index_by
+        self.fields = {name: field.annotation for name, field in model.model_fields.items()}
+        self.lock = threading.Lock()
+        # Readers take self.state once and use only that object. Writers only
+        # append to its columns and clear live flags; compaction builds a new
+        # state and swaps it in, so a reader never mixes the two.
+        self.state = self._new_state()
+        self.journal = None
+
+    def spec(self) -> tuple:
+        return ("columnar", self.model, self.key, self.index_by)
+
+    def dump(self) -> ColumnarState:
+        return self.state.copy()
+
+    def load(self, state: ColumnarState) -> None:
+        self.state = state
+
+    def _new_state(self) -> ColumnarState:
+        return ColumnarState({name: KeyColumn() if name == self.key else new_column(annotation) for name, annotation in self.fields.items()})
+
+    def _models(self, state: ColumnarState, positions: list) -> list:
+        columns = {name: column.take(positions) for name, column in state.columns.items()}
+        return construct_models(self.model, columns)
+
+    def all(self, limit: int = None, after=None) -> list:
+        state = self.state
+        if limit is None and after is None:
+            return self._models(state, list(state.positions.values()))
+        return self._models(state, page_positions(list(state.positions.items()), limit, after))
+
+    def select(self, value, limit: int = None, after=None) -> list:
+        state = self.state
+        live = state.live
+        positions = [p for p in list(state.index.get(value, ())) if live[p]]
+        if limit is not None or after is not None:
+            keys = state.columns[self.key].ints(positions)
+            positions = page_positions(list(zip(keys, positions)), limit, after)
+        return self._models(state, positions)
+
+    def get(self, key: str):
+        state = self.state
+        position = state.positions.get(UUID(key).int)
+        if position is None:
+            return None
+        return self._models(state, [position])[0]
+
+    def contains(self, key: str) -> bool:
+        return UUID(key).int in self.state.positions
+
+    def put(self, key: str, item) -> None:
+        with self.lock:
+            self._put(self.state, UUID(key).int, item)
+            if self.journal is not None:
+                self.journal.write(self, "put", key, item)
+            self._maybe_compact()
+
+    def put_many(self, items: list) -> None:
+        with self.lock:
+            state = self.state
+            for key, item in items:
+                self._put(state, UUID(key).int, item)
+            if self.journal is not None:
+                self.journal.write(self, "put_many", None, items)
+            self._maybe_compact()
+
+    def _put(self, state: ColumnarState, key: int, item) -> None:
+        # Every column is appended before the row is published through
+        # positions and the index, so readers only ever see complete rows.
+        position = len(state.live)
+        for name, column in state.columns.items():
+            column.append(getattr(item, name))
+        state.live.append(1)
+        old = state.positions.get(key)
+        if old is not None:
+            state.live[old] = 0
+            state.dead += 1
+        state.positions[key] = position
+        if self.index_by is not None:
+            state.index.setdefault(getattr(item, self.index_by), array("I")).append(position)
+
+    def replace(self, key: str, item) -> bool:
+        with self.lock:
+            state = self.state
+            row_key = UUID(key).int
+            if row_key not in state.positions:
+                return False
+            self._put(state, row_key, item)
+            if self.journal is not None:
+                self.journal.write(self, "put", key, item)
+            self._maybe_compact()
+            return True
+
+    def remove(self, key: str) -> bool:
+        with self.lock:
+            state = self.state
+            position = state.positions.pop(UUID(key).int, None)
+            if position is None:
+                return False
+            state.live[position] = 0
+            state.dead += 1
+            if self.journal is not None:
+                self.journal.write(self, "remove", key, None)
+            self._maybe_compact()
+            return True
+
+    def _maybe_compact(self) -> None:
+        state = self.state
+        if state.dead < COMPACT_MIN_ROWS or state.dead * 2 < len(state.live):
+            return
+        keys = list(state.positions)
+        items = self._models(state, list(state.positions.values()))
+        compacted = self._new_state()
+        for key, item in zip(keys, items):
+            self._put(compacted, key, item)
+        self.state = compacted
+
+# Keyset pages: the rows whose key sorts after `after`, in key order, picked
+# with a bounded heap so a page costs O(rows log limit) and only the page is
+# turned into models. UUID strings and UUID ints sort the same way, so pages
+# line up with the other backends.
+def page_keys(keys, limit: int = None, after=None) -> list:
+    if after is not None:
+        after = str(after)
+        keys = [key for key in keys if key > after]
+    if limit is None:
+        return sorted(keys)
+    return heapq.nsmallest(limit, keys)
+
+def page_positions(pairs: list, limit: int = None, after=None) -> list:
+    # pairs: [(key as int, position), ...]
+    if after is not None:
+        after = UUID(str(after)).int
+        pairs = [pair for pair in pairs if pair[0] > after]
+    if limit is None:
+        pairs = sorted(pairs)
+    else:
+        pairs = heapq.nsmallest(limit, pairs)
+    return [position for _, position in pairs]
+
+_tables = {}
+_tables_lock = threading.Lock()
+_journal = None
+
+def get_table(name: str, index_by: str = None) -> MemoryTable:
+    table = _tables.get(name)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(name)
+            if table is None:
+                table = _tables[name] = MemoryTable(name, index_by)
+                table.journal = _journal
+    return table
+
+def get_columnar_table(name: str, model, key: str, index_by: str = None) -> ColumnarTable:
+    table = _tables.get(name)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(name)
+            if table is None:
+                table = _tables[name] = ColumnarTable(name, model, key, index_by)
+                table.journal = _journal
+    return table
+
+def make_table(name: str, spec: tuple):
+    if spec[0] == "columnar":
+        return ColumnarTable(name, *spec[1:])
+    return MemoryTable(name, *spec[1:])
+
+# Persistence (off unless open_store is called): every write is appended to
+# <directory>/journal-<generation>.log as one pickle record, and snapshot()
+# writes all tables to snapshot-<generation>.pickle while starting a new
+# journal. Startup loads the newest snapshot and replays the journals after
+# it, so a restart costs one unpickle plus a short replay. Records are flushed
+# to the OS on every write, so they survive a process crash but not a power
+# failure between snapshots.
+SNAPSHOT_JOURNAL_BYTES = 64 << 20
+
+class Journal:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.snapshot_lock = threading.Lock()
+        self.generation = 0
+        self.file = None
+        self.snapshot_threshold = SNAPSHOT_JOURNAL_BYTES
+        self._snapshotting = False
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, kind: str, generation: int) -> str:
+        extension = "pickle" if kind == "snapshot" else "log"
+        return os.path.join(self.directory, f"{kind}-{generation:08d}.{extension}")
+
+    def generations(self, kind: str) -> list:
+        prefix = kind + "-"
+        found = []
+        for name in os.listdir(self.directory):
+            stem, _, extension = name.partition(".")
+            if stem.startswith(prefix) and extension in ("pickle", "log"):
+                found.append(int(stem[len(prefix):]))
+        return sorted(found)
+
+    def load(self) -> None:
+        # Runs before any table has a journal attached, so replayed writes
+        # are not journaled again.
+        snapshots = self.generations("snapshot")
+        start = snapshots[-1] if snapshots else 0
+        if snapshots:
+            with open(self.path("snapshot", start), "rb") as f:
+                tables = pickle.load(f)
+            for name, (spec, data) in tables.items():
+                table = make_table(name, spec)
+                table.load(data)
+                _tables[name] = table
+        journals = [generation for generation in self.generations("journal") if generation >= start]
+        for generation in journals:
+            self._replay(self.path("journal", generation))
+        self.generation = max([start] + journals)
+        self.file = open(self.path("journal", self.generation), "ab")
+
+    def _replay(self, path: str) -> None:
+        with open(path, "r+b") as f:
+            good = 0
+            while True:
+                try:
+                    name, spec, op, key, item = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    break
+                table = _tables.get(name)
+                if table is None:
+                    table = _tables[name] = make_table(name, spec)
+                if op == "put":
+                    table.put(key, item)
+                elif op == "put_many":
+                    table.put_many(item)
+                else:
+                    table.remove(key)
+                good = f.tell()
+            # Drop a record torn by a crash mid-write.
+            f.truncate(good)
+
+    def write(self, table, op: str, key: str, item) -> None:
+        # Called by tables with their own lock held.
+        record = pickle.dumps((table.name, table.spec(), op, key, item), protocol=5)
+        with self.lock:
+            self.file.write(record)
+            self.file.flush()
+            size = self.file.tell()
+        if size >= self.snapshot_threshold and not self._snapshotting:
+            self._snapshotting = True
+            threading.Thread(target=self._background_snapshot, daemon=True).start()
+
+    def _background_snapshot(self) -> None:
+        try:
+            self.snapshot()
+        finally:
+            self._snapshotting = False
+
+    def snapshot(self) -> None:
+        with self.snapshot_lock:
+            with _tables_lock:
+                tables = sorted(_tables.items())
+            # Hold every table's lock (always taken in name order) just long
+            # enough to copy it and switch journals, then pickle the copies
+            # while writers carry on into the new journal.
+            for _, table in tables:
+                table.lock.acquire()
+            try:
+                data = {name: (table.spec(), table.dump()) for name, table in tables}
+                with self.lock:
+                    self.file.close()
+                    self.generation += 1
+                    generation = self.generation
+                    self.file = open(self.path("journal", generation), "ab")
+            finally:
+                for _, table in tables:
+                    table.lock.release()
+            path = self.path("snapshot", generation)
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(data, f, protocol=5)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            for kind in ("snapshot", "journal"):
+                for old in self.generations(kind):
+                    if old < generation:
+                        os.remove(self.path(kind, old))
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+def open_store(directory: str) -> None:
+    global _journal
+    with _tables_lock:
+        if _journal is not None:
+            return
+        journal = Journal(directory)
+        journal.load()
+        for table in _tables.values():
+            table.journal = journal
+        _journal = journal
+
+def close_store() -> None:
+    # Writes a final snapshot so the next start has no journal to replay.
+    global _journal
+    journal = _journal
+    if journal is None:
+        return
+    journal.snapshot()
+    with _tables_lock:
+        for table in _tables.values():
+            table.journal = None
+        _journal = None
+    journal.close()
@@ -0,0 +1,344 @@
+import os
+import threading
+from datetime import date
+from uuid import UUID
+from typing import Iterator, List
+import numpy as np
+import pandas as pd
+from models import PerformanceMetric
+from .base import PerformanceMetricRepository
+from .columnar import construct_models
+from .versions import versions
+from fastapi import HTTPException
+
+# Fixed-width binary store for performance metrics: a small header followed
+# by a packed array of RECORD_DTYPE in a memory-mapped file. Ids are raw
+# 16-byte UUIDs and dates are day ordinals, so NumPy can filter and
+# aggregate straight off the mapping without building Python objects.
+MAGIC = b"CMSMET01"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("count", "<u8")])
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([
+    ("metric_id", "V16"),
+    ("crew_id", "V16"),
+    ("date", "<i4"),
+    ("productivity", "<f8"),
+    ("tasks_completed", "<i8"),
+    ("tasks_total", "<i8"),
+    ("hours_worked", "<f8"),
+])
+INITIAL_CAPACITY = 1024
+
+# Models are built in batches of this many rows when streaming.
+BATCH_ROWS = 10_000
+
+# Columns summed by the rollups; productivity is averaged.
+SUMMED = ["tasks_completed", "tasks_total", "hours_worked"]
+
+class MetricStore:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.lock = threading.RLock()
+        if not os.path.exists(self.file_path):
+            self._create(self.file_path, np.zeros(0, RECORD_DTYPE))
+        self._map()
+        self._slots = None
+
+    @staticmethod
+    def _create(file_path: str, records: np.ndarray) -> None:
+        capacity = max(len(records), INITIAL_CAPACITY)
+        header = np.zeros(1, HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["count"] = len(records)
+        with open(file_path, "wb") as f:
+            f.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+            f.write(records.tobytes())
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+
+    def _map(self) -> None:
+        # The file only ever grows (or is replaced whole), so views handed out
+        # from an earlier mapping stay valid after a remap.
+        capacity = (os.path.getsize(self.file_path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        header = np.memmap(self.file_path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        if header["magic"][0] != MAGIC:
+            raise ValueError(f"{self.file_path} is not a metric store")
+        self._header = header
+        self._records = np.memmap(self.file_path, dtype=RECORD_DTYPE, mode="r+", offset=HEADER_SIZE, shape=(capacity,))
+
+    @property
+    def slots(self) -> dict:
+        # metric_id bytes -> slot, built on the first lookup by id so opening
+        # the store and running scans or rollups never pays for it.
+        slots = self._slots
+        if slots is None:
+            with self.lock:
+                slots = self._slots
+                if slots is None:
+                    ids = self._records["metric_id"][:self.count].tolist()
+                    slots = self._slots = dict(zip(ids, range(len(ids))))
+        return slots
+
+    @property
+    def count(self) -> int:
+        return int(self._header["count"][0])
+
+    def _reserve(self, count: int) -> None:
+        capacity = len(self._records)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        self._records.flush()
+        with open(self.file_path, "r+b") as f:
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._map()
+
+    def view(self) -> np.ndarray:
+        # Zero-copy view of the live records. Deletes move the last record
+        # into the freed slot, so use it for one computation and let it go.
+        return self._records[:self.count]
+
+    def select(self, crew_id: UUID) -> np.ndarray:
+        with self.lock:
+            view = self.view()
+            return view[view["crew_id"] == np.void(crew_id.bytes)]
+
+    def get(self, metric_id: UUID):
+        with self.lock:
+            slot = self.slots.get(metric_id.bytes)
+            if slot is None:
+                return None
+            return self._records[slot:slot + 1].copy()
+
+    def contains(self, metric_id: UUID) -> bool:
+        return metric_id.bytes in self.slots
+
+    def put(self, metric: PerformanceMetric) -> None:
+        record = encode([metric])
+        key = metric.metric_id.bytes
+        with self.lock:
+            slots = self.slots
+            slot = slots.get(key)
+            if slot is None:
+                slot = self.count
+                self._reserve(slot + 1)
+                self._records[slot] = record[0]
+                self._header["count"] = slot + 1
+                slots[key] = slot
+            else:
+                self._records[slot] = record[0]
+
+    def put_many(self, metrics: list) -> None:
+        # Encode the batch once, grow the file at most once and write every
+        # record with a single fancy-indexed assignment; a later duplicate of
+        # an id in the batch wins, as with repeated put() calls.
+        records = encode(metrics)
+        with self.lock:
+            slots = self.slots
+            count = self.count
+            targets = np.empty(len(metrics), np.int64)
+            for i, metric in enumerate(metrics):
+                key = metric.metric_id.bytes
+                slot = slots.get(key)
+                if slot is None:
+                    slot = slots[key] = count
+                    count += 1
+                targets[i] = slot
+            self._reserve(count)
+            self._records[targets] = records
+            self._header["count"] = count
+
+    def replace(self, metric_id: UUID, metric: PerformanceMetric) -> bool:
+        with self.lock:
+            slot = self.slots.get(metric_id.bytes)
+            if slot is None:
+                return False
+            if metric.metric_id != metric_id:
+                self.remove(metric_id)
+                self.put(metric)
+            else:
+                self._records[slot] = encode([metric])[0]
+            return True
+
+    def remove(self, metric_id: UUID) -> bool:
+        with self.lock:
+            slots = self.slots
+            slot = slots.pop(metric_id.bytes, None)
+            if slot is None:
+                return False
+            last = self.count - 1
+            if slot != last:
+                self._records[slot] = self._records[last]
+                slots[self._records["metric_id"][slot].tobytes()] = slot
+            self._header["count"] = last
+            return True
+
+    def replace_all(self, records: np.ndarray) -> None:
+        with self.lock:
+            tmp_path = self.file_path + ".tmp"
+            self._create(tmp_path, records)
+            os.replace(tmp_path, self.file_path)
+            self._map()
+            self._slots = None
+
+    def flush(self) -> None:
+        with self.lock:
+            self._records.flush()
+            self._header.flush()
+
+    def rollup(self, crew_id: UUID) -> dict:
+        return summarize(self.select(crew_id))
+
+    def rollup_by_crew(self) -> dict:
+        with self.lock:
+            view = self.view()
+            crews, inverse = group_ids(view["crew_id"])
+            counts = np.bincount(inverse, minlength=len(crews))
+            productivity = np.bincount(inverse, weights=view["productivity"], minlength=len(crews))
+            sums = {name: np.bincount(inverse, weights=view[name], minlength=len(crews)) for name in SUMMED}
+        rollups = {}
+        for i, crew_id in enumerate(crews.tolist()):
+            rollup = {"count": int(counts[i]), "productivity": float(productivity[i] / counts[i])}
+            rollup.update({name: float(values[i]) for name, values in sums.items()})
+            rollups[UUID(bytes=crew_id)] = rollup
+        return rollups
+
+def group_ids(ids: np.ndarray) -> tuple:
+    # Groups 16-byte ids by hashing the two 64-bit halves together, which is
+    # far cheaper than sorting the raw bytes, then checks every row against
+    # its group's first id and only falls back to the exact sort on a clash.
+    halves = np.ascontiguousarray(ids).view("<u8").reshape(-1, 2)
+    codes, uniques = pd.factorize(halves[:, 0] ^ halves[:, 1])
+    first = np.empty(len(uniques), np.int64)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]
+    if not (halves == halves[first][codes]).all():
+        return np.unique(ids, return_inverse=True)
+    return ids[first], codes
+
+def page_records(records: np.ndarray, limit: int = None, after: UUID = None) -> np.ndarray:
+    # Keyset page on metric_id. Read as two big-endian 64-bit halves, the raw
+    # id bytes sort exactly like the UUID strings the other backends use.
+    halves = np.ascontiguousarray(records["metric_id"]).view(">u8").reshape(-1, 2)
+    if after is not None:
+        high, low = divmod(UUID(str(after)).int, 1 << 64)
+        keep = (halves[:, 0] > high) | ((halves[:, 0] == high) & (halves[:, 1] > low))
+        records, halves = records[keep], halves[keep]
+    order = np.lexsort((halves[:, 1], halves[:, 0]))
+    return records[order[:limit]]
+
+def summarize(records: np.ndarray) -> dict:
+    count = len(records)
+    rollup = {"count": count, "productivity": float(records["productivity"].mean()) if count else 0.0}
+    rollup.update({name: float(records[name].sum()) for name in SUMMED})
+    return rollup
+
+def encode(metrics: list) -> np.ndarray:
+    records = np.zeros(len(metrics), RECORD_DTYPE)
+    records["metric_id"] = np.array([metric.metric_id.bytes for metric in metrics], dtype="V16")
+    records["crew_id"] = np.array([metric.crew_id.bytes for metric in metrics], dtype="V16")
+    records["date"] = [metric.date.toordinal() for metric in metrics]
+    for name in ["productivity", "tasks_completed", "tasks_total", "hours_worked"]:
+        records[name] = [getattr(metric, name) for metric in metrics]
+    return records
+
+def to_models(records: np.ndarray) -> List[PerformanceMetric]:
+    # Crew ids and dates repeat heavily; convert each distinct value once.
+    crews = records["crew_id"].tolist()
+    crew_ids = {value: UUID(bytes=value) for value in set(crews)}
+    days = records["date"].tolist()
+    dates = {value: date.fromordinal(value) for value in set(days)}
+    columns = {
+        "metric_id": [UUID(bytes=value) for value in records["metric_id"].tolist()],
+        "crew_id": [crew_ids[value] for value in crews],
+        "date": [dates[value] for value in days],
+        "productivity": records["productivity"].tolist(),
+        "tasks_completed": records["tasks_completed"].tolist(),
+        "tasks_total": records["tasks_total"].tolist(),
+        "hours_worked": records["hours_worked"].tolist(),
+    }
+    return construct_models(PerformanceMetric, columns)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(file_path: str) -> MetricStore:
+    path = os.path.abspath(file_path)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = MetricStore(file_path)
+    return store
+
+class MmapPerformanceMetricRepository(PerformanceMetricRepository):
+    def __init__(self, file_path: str = "data/metrics.bin"):
+        self.file_path = file_path
+        self.store = get_store(self.file_path)
+
+    def create(self, metric: PerformanceMetric) -> PerformanceMetric:
+        self.store.put(metric)
+        versions.bump("metrics", metric.crew_id)
+        return metric
+
+    def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        self.store.put_many(metrics)
+        versions.bump("metrics", *{metric.crew_id for metric in metrics})
+        return metrics
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        records = self.store.select(crew_id)
+        if limit is not None or after is not None:
+            records = page_records(records, limit, after)
+        return to_models(records)
+
+    def iter_all(self, crew_id: UUID) -> Iterator[PerformanceMetric]:
+        records = self.store.select(crew_id)
+        for start in range(0, len(records), BATCH_ROWS):
+            yield from to_models(records[start:start + BATCH_ROWS])
+
+    def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
+        record = self.store.get(metric_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Metric not found")
+        return to_models(record)[0]
+
+    def update(self, metric_id: UUID, updated_metric: PerformanceMetric) -> PerformanceMetric:
+        if not self.store.replace(metric_id, updated_metric):
+            raise HTTPException(status_code=404, detail="Metric not found")
+        versions.bump("metrics")
+        return updated_metric
+
+    def delete(self, metric_id: UUID) -> None:
+        if not self.store.remove(metric_id):
+            raise HTTPException(status_code=404, detail="Metric not found")
+        versions.bump("metrics")
+
+    def version(self, crew_id: UUID = None) -> str:
+        return versions.tag("metrics", crew_id)
+
+    def rollup(self, crew_id: UUID) -> dict:
+        return self.store.rollup(crew_id)
+
+    def rollup_by_crew(self) -> dict:
+        return self.store.rollup_by_crew()
+
+# CSV -> binary conversion for data/metrics.csv.
+# Run from cms_api/: python -m repositories.mmap_repo
+def convert_csv(csv_path: str = "data/metrics.csv", file_path: str = "data/metrics.bin") -> int:
+    from .csv_storage import get_table
+    frame = get_table(csv_path, list(PerformanceMetric.model_fields), "metric_id", PerformanceMetric, "crew_id").read()
+    records = np.zeros(len(frame), RECORD_DTYPE)
+    for name in ["metric_id", "crew_id"]:
+        values = frame[name].tolist()
+        ids = {value: UUID(value).bytes for value in set(values)}
+        records[name] = np.array([ids[value] for value in values], dtype="V16")
+    epoch = date(1970, 1, 1).toordinal()
+    records["date"] = frame["date"].values.astype("datetime64[D]").astype("int64") + epoch
+    for name in ["productivity", "tasks_completed", "tasks_total", "hours_worked"]:
+        records[name] = frame[name].values
+    get_store(file_path).replace_all(records)
+    return len(records)
+
+if __name__ == "__main__":
+    print(f"data/metrics.csv: {convert_csv()} rows")
@@ -0,0 +1,588 @@
+import os
+import threading
+import time
+import uuid
+from datetime import date
+from enum import Enum
+from uuid import UUID
+from typing import Iterator, List
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport
+from .base import UserRepository, CrewRepository, ProjectRepository, PerformanceMetricRepository, ActivityRepository, ShipmentRepository, ScheduleStatusRepository, TimeReportRepository
+from .columnar import convert_values, construct_models
+from .role_cache import roles, check_foreman
+from .versions import signature_tag
+from fastapi import HTTPException
+
+# Each entity is a directory of immutable Parquet part files, each sorted by
+# the column list endpoints filter on (crew_id/project_id), so row-group
+# statistics let Arrow skip data that cannot match. Inserts add a part;
+# small parts are merged once there are more than MAX_SMALL_PARTS of them.
+ROW_GROUP_SIZE = 64 * 1024
+MAX_SMALL_PARTS = 16
+# A part that replaces others (a rewrite or a merge) is published with a
+# "<part>.replaces" file naming them, written first. Once the part is visible
+# the parts it names are not, so a reader listing the directory never sees a
+# row both before and after the swap, in this process or another.
+REPLACES = ".replaces"
+
+def arrow_type(annotation) -> pa.DataType:
+    if annotation is date:
+        return pa.date32()
+    if annotation is float:
+        return pa.float64()
+    if annotation is int:
+        return pa.int64()
+    return pa.string()
+
+class ParquetDataset:
+    def __init__(self, directory: str, model, key: str, sort_by: str = None):
+        self.directory = directory
+        self.model = model
+        self.key = key
+        self.sort_by = sort_by
+        self.fields = {name: field.annotation for name, field in model.model_fields.items()}
+        self.schema = pa.schema([(name, arrow_type(annotation)) for name, annotation in self.fields.items()])
+        self.lock = threading.RLock()
+        self._row_counts = {}
+        self._locations = None  # (parts, {key: part})
+        os.makedirs(self.directory, exist_ok=True)
+
+    def parts(self) -> list:
+        names = os.listdir(self.directory)
+        parts = {name for name in names if name.endswith(".parquet") and not name.startswith(".")}
+        for name in names:
+            if name.endswith(REPLACES) and name[:-len(REPLACES)] in parts:
+                parts.difference_update(self._replaced(name))
+        return sorted(parts)
+
+    def _replaced(self, name: str) -> list:
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return f.read().split()
+        except FileNotFoundError:
+            # Removed after the parts it names were.
+            return []
+
+    def version(self) -> str:
+        # Parts are immutable and uniquely named, so the part list changes
+        # with every write, from any process, and costs one listdir.
+        return signature_tag(tuple(self.parts()))
+
+    def select(self, limit: int = None, after=None, **equals) -> list:
+        # Equality filters are pushed down to the Parquet reader, and only the
+        # model's columns are read.
+        expression = self._expression(equals)
+        paged = limit is not None or after is not None
+        if after is not None:
+            term = ds.field(self.key) > str(after)
+            expression = term if expression is None else expression & term
+        try:
+            table = self._page(expression, limit) if paged else self._scan(expression)
+        except FileNotFoundError:
+            # A part was merged away between listing and reading it.
+            with self.lock:
+                table = self._page(expression, limit) if paged else self._scan(expression)
+        return self.to_models(table)
+
+    def _page(self, expression, limit: int = None) -> pa.Table:
+        # Keyset page: pick the page's keys from the key column alone, then
+        # read full rows for just those keys, in key order.
+        dataset = self._dataset()
+        if limit is not None:
+            keys = dataset.to_table(columns=[self.key], filter=expression)
+            if keys.num_rows > limit:
+                first = pc.select_k_unstable(keys, limit, [(self.key, "ascending")])
+                expression = ds.field(self.key).isin(keys.column(0).take(first))
+        table = dataset.to_table(columns=list(self.fields), filter=expression)
+        return table.sort_by(self.key)
+
+    def get(self, key: str):
+        # Reads only the part the key is in, found through the key locations.
+        try:
+            table = self._read_key(key)
+        except FileNotFoundError:
+            # The part was rewritten between locating and reading it.
+            with self.lock:
+                table = self._read_key(key)
+        if table is None or not table.num_rows:
+            return None
+        return self.to_models(table)[0]
+
+    def _read_key(self, key: str):
+        part = self._locate(key)
+        if part is None:
+            return None
+        table = self._read_part(part)
+        return table.filter(pc.equal(table.column(self.key), key))
+
+    def iter_select(self, **equals):
+        # Streams matching rows one record batch at a time.
+        with self.lock:
+            dataset = self._dataset()
+        for batch in dataset.to_batches(columns=list(self.fields), filter=self._expression(equals)):
+            if batch.num_rows:
+                yield from self.to_models(pa.Table.from_batches([batch]))
+
+    def _expression(self, equals: dict):
+        expression = None
+        for name, value in equals.items():
+            term = ds.field(name) == value
+            expression = term if expression is None else expression & term
+        return expression
+
+    def _dataset(self) -> ds.Dataset:
+        paths = [os.path.join(self.directory, part) for part in self.parts()]
+        return ds.dataset(paths, schema=self.schema, format="parquet")
+
+    def _scan(self, expression) -> pa.Table:
+        return self._dataset().to_table(columns=list(self.fields), filter=expression)
+
+    def to_models(self, table: pa.Table) -> list:
+        columns = {name: convert_values(table.column(name).to_pylist(), annotation) for name, annotation in self.fields.items()}
+        return construct_models(self.model, columns)
+
+    def encode(self, item) -> dict:
+        row = {}
+        for name in self.fields:
+            value = getattr(item, name)
+            if isinstance(value, UUID):
+                value = str(value)
+            elif isinstance(value, Enum):
+                value = value.value
+            row[name] = value
+        return row
+
+    def insert(self, items: list) -> None:
+        self.insert_table(pa.Table.from_pylist([self.encode(item) for item in items], schema=self.schema))
+
+    def insert_table(self, table: pa.Table) -> None:
+        with self.lock:
+            self._commit({}, table)
+            self._maybe_compact()
+
+    def replace(self, key: str, item) -> bool:
+        return self._rewrite(key, item)
+
+    def remove(self, key: str) -> bool:
+        return self._rewrite(key, None)
+
+    def replace_all(self, table: pa.Table) -> None:
+        with self.lock:
+            removed = {part: self._read_part(part) for part in self.parts()}
+            self._commit(removed, table)
+
+    def _rewrite(self, key: str, item) -> bool:
+        # Parts are immutable: rewrite the one part holding the key.
+        with self.lock:
+            part = self._locate(key)
+            if part is None:
+                return False
+            table = self._read_part(part)
+            kept = table.filter(pc.not_equal(table.column(self.key), key))
+            if item is not None:
+                kept = pa.concat_tables([kept, pa.Table.from_pylist([self.encode(item)], schema=self.schema)])
+            self._commit({part: table}, kept)
+            return True
+
+    def _locate(self, key: str):
+        parts = tuple(self.parts())
+        cached = self._locations
+        if cached is None or cached[0] != parts:
+            locations = {}
+            for part in parts:
+                keys = pq.read_table(os.path.join(self.directory, part), columns=[self.key]).column(0).to_pylist()
+                locations.update(dict.fromkeys(keys, part))
+            cached = self._locations = (parts, locations)
+        return cached[1].get(key)
+
+    def _read_part(self, part: str) -> pa.Table:
+        return pq.read_table(os.path.join(self.directory, part), schema=self.schema)
+
+    def _row_count(self, part: str) -> int:
+        count = self._row_counts.get(part)
+        if count is None:
+            count = self._row_counts[part] = pq.ParquetFile(os.path.join(self.directory, part)).metadata.num_rows
+        return count
+
+    def _commit(self, removed: dict, added: pa.Table) -> None:
+        # removed: part -> its table (needed to keep the key locations in step).
+        cached = self._locations
+        if cached is not None and cached[0] != tuple(self.parts()):
+            cached = None
+        new_parts = {}
+        if added.num_rows:
+            new_parts[self._write_part(added, list(removed))] = added
+        for part in removed:
+            os.remove(os.path.join(self.directory, part))
+            self._row_counts.pop(part, None)
+        for part in new_parts:
+            if removed:
+                os.remove(os.path.join(self.directory, part + REPLACES))
+        if cached is None:
+            self._locations = None
+            return
+        locations = cached[1]
+        for table in removed.values():
+            for key in table.column(self.key).to_pylist():
+                locations.pop(key, None)
+        for part, table in new_parts.items():
+            locations.update(dict.fromkeys(table.column(self.key).to_pylist(), part))
+        self._locations = (tuple(self.parts()), locations)
+
+    def _write_part(self, table: pa.Table, replaces: list) -> str:
+        if self.sort_by:
+            table = table.sort_by(self.sort_by)
+        part = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(self.directory, "." + part)
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        if replaces:
+            with open(os.path.join(self.directory, part + REPLACES), "w") as f:
+                f.write("\n".join(replaces))
+        os.replace(tmp_path, os.path.join(self.directory, part))
+        self._row_counts[part] = table.num_rows
+        return part
+
+    def _maybe_compact(self) -> None:
+        small = [part for part in self.parts() if self._row_count(part) < ROW_GROUP_SIZE]
+        if len(small) > MAX_SMALL_PARTS:
+            removed = {part: self._read_part(part) for part in small}
+            self._commit(removed, pa.concat_tables(list(removed.values())))
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+def get_dataset(directory: str, model, key: str, sort_by: str = None) -> ParquetDataset:
+    path = os.path.abspath(directory)
+    dataset = _datasets.get(path)
+    if dataset is None:
+        with _datasets_lock:
+            dataset = _datasets.get(path)
+            if dataset is None:
+                dataset = _datasets[path] = ParquetDataset(directory, model, key, sort_by)
+    return dataset
+
+class ParquetUserRepository(UserRepository):
+    def __init__(self, directory: str = "data/parquet/users"):
+        self.table = get_dataset(directory, User, "user_id")
+
+    def create(self, user: User) -> User:
+        self.table.insert([user])
+        roles.invalidate(user.user_id)
+        return user
+
+    def create_many(self, users: List[User]) -> List[User]:
+        self.table.insert(users)
+        roles.invalidate(*(user.user_id for user in users))
+        return users
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[User]:
+        return self.table.select(limit, after)
+
+    def get_by_id(self, user_id: UUID) -> User:
+        item = self.table.get(str(user_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return item
+
+    def update(self, user_id: UUID, updated_user: User) -> User:
+        if not self.table.replace(str(user_id), updated_user):
+            raise HTTPException(status_code=404, detail="User not found")
+        roles.invalidate(user_id, updated_user.user_id)
+        return updated_user
+
+    def delete(self, user_id: UUID) -> None:
+        if not self.table.remove(str(user_id)):
+            raise HTTPException(status_code=404, detail="User not found")
+        roles.invalidate(user_id)
+
+    def version(self) -> str:
+        return self.table.version()
+
+class ParquetCrewRepository(CrewRepository):
+    def __init__(self, directory: str = "data/parquet/crews"):
+        self.table = get_dataset(directory, Crew, "crew_id", sort_by="project_id")
+
+    def create(self, crew: Crew) -> Crew:
+        self.table.insert([crew])
+        return crew
+
+    def create_many(self, crews: List[Crew]) -> List[Crew]:
+        self.table.insert(crews)
+        return crews
+
+    def get_all(self, project_id: UUID = None, limit: int = None, after: UUID = None) -> List[Crew]:
+        if project_id:
+            return self.table.select(limit, after, project_id=str(project_id))
+        return self.table.select(limit, after)
+
+    def get_by_id(self, crew_id: UUID) -> Crew:
+        item = self.table.get(str(crew_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Crew not found")
+        return item
+
+    def update(self, crew_id: UUID, updated_crew: Crew) -> Crew:
+        if not self.table.replace(str(crew_id), updated_crew):
+            raise HTTPException(status_code=404, detail="Crew not found")
+        return updated_crew
+
+    def delete(self, crew_id: UUID) -> None:
+        if not self.table.remove(str(crew_id)):
+            raise HTTPException(status_code=404, detail="Crew not found")
+
+    def version(self, project_id: UUID = None) -> str:
+        return self.table.version()
+
+class ParquetProjectRepository(ProjectRepository):
+    def __init__(self, directory: str = "data/parquet/projects"):
+        self.table = get_dataset(directory, Project, "project_id")
+
+    def create(self, project: Project) -> Project:
+        self.table.insert([project])
+        return project
+
+    def create_many(self, projects: List[Project]) -> List[Project]:
+        self.table.insert(projects)
+        return projects
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[Project]:
+        return self.table.select(limit, after)
+
+    def get_by_id(self, project_id: UUID) -> Project:
+        item = self.table.get(str(project_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return item
+
+    def update(self, project_id: UUID, updated_project: Project) -> Project:
+        if not self.table.replace(str(project_id), updated_project):
+            raise HTTPException(status_code=404, detail="Project not found")
+        return updated_project
+
+    def delete(self, project_id: UUID) -> None:
+        if not self.table.remove(str(project_id)):
+            raise HTTPException(status_code=404, detail="Project not found")
+
+    def version(self) -> str:
+        return self.table.version()
+
+class ParquetPerformanceMetricRepository(PerformanceMetricRepository):
+    def __init__(self, directory: str = "data/parquet/metrics"):
+        self.table = get_dataset(directory, PerformanceMetric, "metric_id", sort_by="crew_id")
+
+    def create(self, metric: PerformanceMetric) -> PerformanceMetric:
+        self.table.insert([metric])
+        return metric
+
+    def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        self.table.insert(metrics)
+        return metrics
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        return self.table.select(limit, after, crew_id=str(crew_id))
+
+    def iter_all(self, crew_id: UUID) -> Iterator[PerformanceMetric]:
+        return self.table.iter_select(crew_id=str(crew_id))
+
+    def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
+        item = self.table.get(str(metric_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Metric not found")
+        return item
+
+    def update(self, metric_id: UUID, updated_metric: PerformanceMetric) -> PerformanceMetric:
+        if not self.table.replace(str(metric_id), updated_metric):
+            raise HTTPException(status_code=404, detail="Metric not found")
+        return updated_metric
+
+    def delete(self, metric_id: UUID) -> None:
+        if not self.table.remove(str(metric_id)):
+            raise HTTPException(status_code=404, detail="Metric not found")
+
+    def version(self, crew_id: UUID = None) -> str:
+        return self.table.version()
+
+class ParquetActivityRepository(ActivityRepository):
+    def __init__(self, directory: str = "data/parquet/activities"):
+        self.table = get_dataset(directory, Activity, "activity_id", sort_by="project_id")
+
+    def create(self, activity: Activity) -> Activity:
+        self.table.insert([activity])
+        return activity
+
+    def create_many(self, activities: List[Activity]) -> List[Activity]:
+        self.table.insert(activities)
+        return activities
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Activity]:
+        return self.table.select(limit, after, project_id=str(project_id))
+
+    def get_by_id(self, activity_id: UUID) -> Activity:
+        item = self.table.get(str(activity_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return item
+
+    def update(self, activity_id: UUID, updated_activity: Activity) -> Activity:
+        if not self.table.replace(str(activity_id), updated_activity):
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return updated_activity
+
+    def delete(self, activity_id: UUID) -> None:
+        if not self.table.remove(str(activity_id)):
+            raise HTTPException(status_code=404, detail="Activity not found")
+
+    def version(self, project_id: UUID = None) -> str:
+        return self.table.version()
+
+class ParquetShipmentRepository(ShipmentRepository):
+    def __init__(self, directory: str = "data/parquet/shipments"):
+        self.table = get_dataset(directory, Shipment, "shipment_id", sort_by="project_id")
+
+    def create(self, shipment: Shipment) -> Shipment:
+        self.table.insert([shipment])
+        return shipment
+
+    def create_many(self, shipments: List[Shipment]) -> List[Shipment]:
+        self.table.insert(shipments)
+        return shipments
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Shipment]:
+        return self.table.select(limit, after, project_id=str(project_id))
+
+    def get_by_id(self, shipment_id: UUID) -> Shipment:
+        item = self.table.get(str(shipment_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        return item
+
+    def update(self, shipment_id: UUID, updated_shipment: Shipment) -> Shipment:
+        if not self.table.replace(str(shipment_id), updated_shipment):
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        return updated_shipment
+
+    def delete(self, shipment_id: UUID) -> None:
+        if not self.table.remove(str(shipment_id)):
+            raise HTTPException(status_code=404, detail="Shipment not found")
+
+    def version(self, project_id: UUID = None) -> str:
+        return self.table.version()
+
+class ParquetScheduleStatusRepository(ScheduleStatusRepository):
+    def __init__(self, directory: str = "data/parquet/statuses"):
+        self.table = get_dataset(directory, ScheduleStatus, "status_id", sort_by="project_id")
+
+    def create(self, status: ScheduleStatus) -> ScheduleStatus:
+        self.table.insert([status])
+        return status
+
+    def create_many(self, statuses: List[ScheduleStatus]) -> List[ScheduleStatus]:
+        self.table.insert(statuses)
+        return statuses
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[ScheduleStatus]:
+        return self.table.select(limit, after, project_id=str(project_id))
+
+    def get_by_id(self, status_id: UUID) -> ScheduleStatus:
+        item = self.table.get(str(status_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Status not found")
+        return item
+
+    def update(self, status_id: UUID, updated_status: ScheduleStatus) -> ScheduleStatus:
+        if not self.table.replace(str(status_id), updated_status):
+            raise HTTPException(status_code=404, detail="Status not found")
+        return updated_status
+
+    def delete(self, status_id: UUID) -> None:
+        if not self.table.remove(str(status_id)):
+            raise HTTPException(status_code=404, detail="Status not found")
+
+    def version(self, project_id: UUID = None) -> str:
+        return self.table.version()
+
+class ParquetTimeReportRepository(TimeReportRepository):
+    def __init__(self, directory: str = "data/parquet/reports"):
+        self.table = get_dataset(directory, TimeReport, "report_id", sort_by="crew_id")
+        self.users = ParquetUserRepository().table
+
+    def load_role(self, user_id: str):
+        user = self.users.get(user_id)
+        return user.role if user else None
+
+    def create(self, report: TimeReport, user_id: UUID) -> TimeReport:
+        check_foreman(user_id, self.load_role, "submit")
+        self.table.insert([report])
+        return report
+
+    def create_many(self, reports: List[TimeReport], user_id: UUID) -> List[TimeReport]:
+        check_foreman(user_id, self.load_role, "submit")
+        self.table.insert(reports)
+        return reports
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[TimeReport]:
+        return self.table.select(limit, after, crew_id=str(crew_id))
+
+    def iter_all(self, crew_id: UUID) -> Iterator[TimeReport]:
+        return self.table.iter_select(crew_id=str(crew_id))
+
+    def get_by_id(self, report_id: UUID) -> TimeReport:
+        item = self.table.get(str(report_id))
+        if item is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+        return item
+
+    def update(self, report_id: UUID, updated_report: TimeReport, user_id: UUID) -> TimeReport:
+        try:
+            check_foreman(user_id, self.load_role, "update")
+        except HTTPException:
+            # A missing report is a 404 whoever asks.
+            if self.table.get(str(report_id)) is None:
+                raise HTTPException(status_code=404, detail="Report not found")
+            raise
+        if not self.table.replace(str(report_id), updated_report):
+            raise HTTPException(status_code=404, detail="Report not found")
+        return updated_report
+
+    def delete(self, report_id: UUID) -> None:
+        if not self.table.remove(str(report_id)):
+            raise HTTPException(status_code=404, detail="Report not found")
+
+    def version(self, crew_id: UUID = None) -> str:
+        return self.table.version()
+
+# CSV -> Parquet conversion for the files under data/.
+# Run from cms_api/: python -m repositories.parquet_repo
+CSV_SOURCES = {
+    "data/users.csv": (ParquetUserRepository, User, "user_id"),
+    "data/crews.csv": (ParquetCrewRepository, Crew, "crew_id"),
+    "data/projects.csv": (ParquetProjectRepository, Project, "project_id"),
+    "data/metrics.csv": (ParquetPerformanceMetricRepository, PerformanceMetric, "metric_id"),
+    "data/activities.csv": (ParquetActivityRepository, Activity, "activity_id"),
+    "data/shipments.csv": (ParquetShipmentRepository, Shipment, "shipment_id"),
+    "data/statuses.csv": (ParquetScheduleStatusRepository, ScheduleStatus, "status_id"),
+    "data/reports.csv": (ParquetTimeReportRepository, TimeReport, "report_id"),
+}
+
+def convert_csv(csv_path: str, repository, model, key: str) -> int:
+    # Read through the CSV table so pending updates/deletes in its change log
+    # are included, then replace the dataset's contents.
+    from .csv_storage import get_table
+    from .csv_repo import PARTITIONED_SOURCES
+    partition_by = PARTITIONED_SOURCES[csv_path][2] if csv_path in PARTITIONED_SOURCES else None
+    frame = get_table(csv_path, list(model.model_fields), key, model, partition_by).read()
+    dataset = repository().table
+    table = pa.Table.from_pandas(frame[list(dataset.fields)], preserve_index=False).cast(dataset.schema)
+    dataset.replace_all(table)
+    return table.num_rows
+
+if __name__ == "__main__":
+    for csv_path, (repository, model, key) in CSV_SOURCES.items():
+        try:
+            print(f"{csv_path}: {convert_csv(csv_path, repository, model, key)} rows")
+        except (KeyError, ValueError) as e:
+            print(f"{csv_path}: skipped ({e})")
@@ -0,0 +1,77 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_db, get_async_db
+
+ENTITIES = ("users", "crews", "projects", "metrics", "activities", "shipments", "statuses", "reports")
+
+def repository_classes(backend: str) -> dict:
+    # Imports only the selected backend, so pandas and pyarrow are loaded
+    # only when it needs them.
+    match backend:
+        case "SQL":
+            from .sqlmodel_repo import SQLModelUserRepository, SQLModelCrewRepository, SQLModelProjectRepository, SQLModelPerformanceMetricRepository, SQLModelActivityRepository, SQLModelShipmentRepository, SQLModelScheduleStatusRepository, SQLModelTimeReportRepository
+            return {"users": SQLModelUserRepository, "crews": SQLModelCrewRepository, "projects": SQLModelProjectRepository, "metrics": SQLModelPerformanceMetricRepository, "activities": SQLModelActivityRepository, "shipments": SQLModelShipmentRepository, "statuses": SQLModelScheduleStatusRepository, "reports": SQLModelTimeReportRepository}
+        case "ASYNCSQL":
+            from .sqlmodel_repo import AsyncSQLModelUserRepository, AsyncSQLModelCrewRepository, AsyncSQLModelProjectRepository, AsyncSQLModelPerformanceMetricRepository, AsyncSQLModelActivityRepository, AsyncSQLModelShipmentRepository, AsyncSQLModelScheduleStatusRepository, AsyncSQLModelTimeReportRepository
+            return {"users": AsyncSQLModelUserRepository, "crews": AsyncSQLModelCrewRepository, "projects": AsyncSQLModelProjectRepository, "metrics": AsyncSQLModelPerformanceMetricRepository, "activities": AsyncSQLModelActivityRepository, "shipments": AsyncSQLModelShipmentRepository, "statuses": AsyncSQLModelScheduleStatusRepository, "reports": AsyncSQLModelTimeReportRepository}
+        case "CSV":
+            from .csv_repo import CSVUserRepository, CSVCrewRepository, CSVProjectRepository, CSVPerformanceMetricRepository, CSVActivityRepository, CSVShipmentRepository, CSVScheduleStatusRepository, CSVTimeReportRepository
+            return {"users": CSVUserRepository, "crews": CSVCrewRepository, "projects": CSVProjectRepository, "metrics": CSVPerformanceMetricRepository, "activities": CSVActivityRepository, "shipments": CSVShipmentRepository, "statuses": CSVScheduleStatusRepository, "reports": CSVTimeReportRepository}
+        case "MEM":
+            from .in_memory_repo import InMemoryUserRepository, InMemoryCrewRepository, InMemoryProjectRepository, InMemoryPerformanceMetricRepository, InMemoryActivityRepository, InMemoryShipmentRepository, InMemoryScheduleStatusRepository, InMemoryTimeReportRepository
+            return {"users": InMemoryUserRepository, "crews": InMemoryCrewRepository, "projects": InMemoryProjectRepository, "metrics": InMemoryPerformanceMetricRepository, "activities": InMemoryActivityRepository, "shipments": InMemoryShipmentRepository, "statuses": InMemoryScheduleStatusRepository, "reports": InMemoryTimeReportRepository}
+        case "PARQUET":
+            from .parquet_repo import ParquetUserRepository, ParquetCrewRepository, ParquetProjectRepository, ParquetPerformanceMetricRepository, ParquetActivityRepository, ParquetShipmentRepository, ParquetScheduleStatusRepository, ParquetTimeReportRepository
+            return {"users": ParquetUserRepository, "crews": ParquetCrewRepository, "projects": ParquetProjectRepository, "metrics": ParquetPerformanceMetricRepository, "activities": ParquetActivityRepository, "shipments": ParquetShipmentRepository, "statuses": ParquetScheduleStatusRepository, "reports": ParquetTimeReportRepository}
+        case "MMAP":
+            from .mmap_repo import MmapPerformanceMetricRepository
+            return {"metrics": MmapPerformanceMetricRepository}
+        case _:
+            raise ValueError(f"Invalid repotype {backend!r}. Use 'SQL', 'ASYNCSQL', 'CSV', 'MEM', 'PARQUET', or 'MMAP'.")
+
+# One repository per entity for the configured backends. CSV, MEM, PARQUET
+# and MMAP repositories only hold shared tables, so build() makes each once at
+# startup and every request gets the same instance. SQL repositories hold the
+# request's session and nothing else, so they are made per request around the
+# session FastAPI injects. The dependencies are async so FastAPI calls them
+# inline instead of through the threadpool.
+class RepositoryRegistry:
+    def __init__(self, backends: dict):
+        # entity -> backend name
+        self.backends = backends
+        self.classes = {}
+        for backend in set(backends.values()):
+            classes = repository_classes(backend)
+            for entity, entity_backend in backends.items():
+                if entity_backend == backend:
+                    if entity not in classes:
+                        raise ValueError(f"{backend} has no {entity} repository")
+                    self.classes[entity] = classes[entity]
+        self.instances = {}
+
+    def build(self) -> None:
+        # Run after the backend's storage is open: open_store replaces the
+        # MEM tables a repository built earlier would still point at.
+        self.instances = {
+            entity: self.classes[entity]()
+            for entity, backend in self.backends.items()
+            if backend not in ("SQL", "ASYNCSQL")
+        }
+
+    def clear(self) -> None:
+        self.instances = {}
+
+    def dependency(self, entity: str):
+        repository_class = self.classes[entity]
+        match self.backends[entity]:
+            case "SQL":
+                async def get_repository(db: Session = Depends(get_db)):
+                    return repository_class(db)
+            case "ASYNCSQL":
+                async def get_repository(db: AsyncSession = Depends(get_async_db)):
+                    return repository_class(db)
+            case _:
+                async def get_repository():
+                    return self.instances[entity]
+        return get_repository
@@ -1,10 +1,35 @@
-from sqlmodel import Session, select
+from sqlmodel import Session, delete, insert, select, update
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
-from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport, Role
+from models import User, Crew, Project, PerformanceMetric, Activity, Shipment, ScheduleStatus, TimeReport
 from database import User as UserModel, Crew as CrewModel, Project as ProjectModel, PerformanceMetric as MetricModel, Activity as ActivityModel, Shipment as ShipmentModel, ScheduleStatus as StatusModel, TimeReport as ReportModel
+from .role_cache import roles, check_foreman, check_foreman_async
 from .base import UserRepository, CrewRepository, ProjectRepository, PerformanceMetricRepository, ActivityRepository, ShipmentRepository, ScheduleStatusRepository, TimeReportRepository
 from uuid import UUID
-from typing import List
+from typing import AsyncIterator, Iterator, List
+
+# Rows fetched per round trip when streaming a list endpoint.
+STREAM_BATCH_SIZE = 1000
+
+def page(query, key, limit: int = None, after: UUID = None):
+    # Keyset pagination on the primary key: WHERE key > :after ORDER BY key
+    # LIMIT :limit, which the key's index answers without an OFFSET scan.
+    if after is not None:
+        query = query.where(key > str(after))
+    if limit is not None or after is not None:
+        query = query.order_by(key).limit(limit)
+    return query
+
+# Write counter of a table, kept by the triggers in database.MIGRATIONS. It
+# counts every write to the table, so it ignores the partition a listing asks for.
+VERSION_QUERY = text("SELECT version FROM tableversion WHERE name = :name")
+
+def table_version(db: Session, table: str) -> str:
+    return str(db.exec(VERSION_QUERY, params={"name": table}).scalar_one())
+
+async def async_table_version(db: AsyncSession, table: str) -> str:
+    return str((await db.exec(VERSION_QUERY, params={"name": table})).scalar_one())
 
 class SQLModelUserRepository(UserRepository):
     def __init__(self, db: Session):
@@ -14,11 +39,22 @@ class SQLModelUserRepository(UserRepository):
         db_user = UserModel(user_id=str(user.user_id), username=user.username, role=user.role.value)
         self.db.add(db_user)
         self.db.commit()
-        self.db.refresh(db_user)
+        roles.invalidate(user.user_id)
         return user
 
-    def get_all(self) -> List[User]:
-        return self.db.exec(select(UserModel)).all()
+    def create_many(self, users: List[User]) -> List[User]:
+        rows = [
+            dict(user_id=str(user.user_id), username=user.username, role=user.role.value)
+            for user in users
+        ]
+        if rows:
+            self.db.exec(insert(UserModel), params=rows)
+            self.db.commit()
+        roles.invalidate(*(user.user_id for user in users))
+        return users
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[User]:
+        return self.db.exec(page(select(UserModel), UserModel.user_id, limit, after)).all()
 
     def get_by_id(self, user_id: UUID) -> User:
         user = self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id))).first()
@@ -27,22 +63,24 @@ class SQLModelUserRepository(UserRepository):
         return user
 
     def update(self, user_id: UUID, updated_user: User) -> User:
-        user = self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id))).first()
-        if not user:
+        statement = update(UserModel).where(UserModel.user_id == str(user_id)).values(
+            user_id=str(updated_user.user_id), username=updated_user.username,
+            role=updated_user.role.value
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="User not found")
-        user.user_id = str(updated_user.user_id)
-        user.username = updated_user.username
-        user.role = updated_user.role.value
         self.db.commit()
-        self.db.refresh(user)
+        roles.invalidate(user_id, updated_user.user_id)
         return updated_user
 
     def delete(self, user_id: UUID) -> None:
-        user = self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id))).first()
-        if not user:
+        if self.db.exec(delete(UserModel).where(UserModel.user_id == str(user_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="User not found")
-        self.db.delete(user)
         self.db.commit()
+        roles.invalidate(user_id)
+
+    def version(self) -> str:
+        return table_version(self.db, "user")
 
 class SQLModelCrewRepository(CrewRepository):
     def __init__(self, db: Session):
@@ -52,14 +90,23 @@ class SQLModelCrewRepository(CrewRepository):
         db_crew = CrewModel(crew_id=str(crew.crew_id), name=crew.name, project_id=str(crew.project_id))
         self.db.add(db_crew)
         self.db.commit()
-        self.db.refresh(db_crew)
         return crew
 
-    def get_all(self, project_id: UUID = None) -> List[Crew]:
+    def create_many(self, crews: List[Crew]) -> List[Crew]:
+        rows = [
+            dict(crew_id=str(crew.crew_id), name=crew.name, project_id=str(crew.project_id))
+            for crew in crews
+        ]
+        if rows:
+            self.db.exec(insert(CrewModel), params=rows)
+            self.db.commit()
+        return crews
+
+    def get_all(self, project_id: UUID = None, limit: int = None, after: UUID = None) -> List[Crew]:
         query = select(CrewModel)
         if project_id:
             query = query.where(CrewModel.project_id == str(project_id))
-        return self.db.exec(query).all()
+        return self.db.exec(page(query, CrewModel.crew_id, limit, after)).all()
 
     def get_by_id(self, crew_id: UUID) -> Crew:
         crew = self.db.exec(select(CrewModel).where(CrewModel.crew_id == str(crew_id))).first()
@@ -68,23 +115,23 @@ class SQLModelCrewRepository(CrewRepository):
         return crew
 
     def update(self, crew_id: UUID, updated_crew: Crew) -> Crew:
-        crew = self.db.exec(select(CrewModel).where(CrewModel.crew_id == str(crew_id))).first()
-        if not crew:
+        statement = update(CrewModel).where(CrewModel.crew_id == str(crew_id)).values(
+            crew_id=str(updated_crew.crew_id), name=updated_crew.name,
+            project_id=str(updated_crew.project_id)
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Crew not found")
-        crew.crew_id = str(updated_crew.crew_id)
-        crew.name = updated_crew.name
-        crew.project_id = str(updated_crew.project_id)
         self.db.commit()
-        self.db.refresh(crew)
         return updated_crew
 
     def delete(self, crew_id: UUID) -> None:
-        crew = self.db.exec(select(CrewModel).where(CrewModel.crew_id == str(crew_id))).first()
-        if not crew:
+        if self.db.exec(delete(CrewModel).where(CrewModel.crew_id == str(crew_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Crew not found")
-        self.db.delete(crew)
         self.db.commit()
 
+    def version(self, project_id: UUID = None) -> str:
+        return table_version(self.db, "crew")
+
 class SQLModelProjectRepository(ProjectRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -93,11 +140,20 @@ class SQLModelProjectRepository(ProjectRepository):
         db_project = ProjectModel(project_id=str(project.project_id), name=project.name, start_date=project.start_date, end_date=project.end_date)
         self.db.add(db_project)
         self.db.commit()
-        self.db.refresh(db_project)
         return project
 
-    def get_all(self) -> List[Project]:
-        return self.db.exec(select(ProjectModel)).all()
+    def create_many(self, projects: List[Project]) -> List[Project]:
+        rows = [
+            dict(project_id=str(project.project_id), name=project.name, start_date=project.start_date, end_date=project.end_date)
+            for project in projects
+        ]
+        if rows:
+            self.db.exec(insert(ProjectModel), params=rows)
+            self.db.commit()
+        return projects
+
+    def get_all(self, limit: int = None, after: UUID = None) -> List[Project]:
+        return self.db.exec(page(select(ProjectModel), ProjectModel.project_id, limit, after)).all()
 
     def get_by_id(self, project_id: UUID) -> Project:
         project = self.db.exec(select(ProjectModel).where(ProjectModel.project_id == str(project_id))).first()
@@ -106,24 +162,23 @@ class SQLModelProjectRepository(ProjectRepository):
         return project
 
     def update(self, project_id: UUID, updated_project: Project) -> Project:
-        project = self.db.exec(select(ProjectModel).where(ProjectModel.project_id == str(project_id))).first()
-        if not project:
+        statement = update(ProjectModel).where(ProjectModel.project_id == str(project_id)).values(
+            project_id=str(updated_project.project_id), name=updated_project.name,
+            start_date=updated_project.start_date, end_date=updated_project.end_date
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Project not found")
-        project.project_id = str(updated_project.project_id)
-        project.name = updated_project.name
-        project.start_date = updated_project.start_date
-        project.end_date = updated_project.end_date
         self.db.commit()
-        self.db.refresh(project)
         return updated_project
 
     def delete(self, project_id: UUID) -> None:
-        project = self.db.exec(select(ProjectModel).where(ProjectModel.project_id == str(project_id))).first()
-        if not project:
+        if self.db.exec(delete(ProjectModel).where(ProjectModel.project_id == str(project_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Project not found")
-        self.db.delete(project)
         self.db.commit()
 
+    def version(self) -> str:
+        return table_version(self.db, "project")
+
 class SQLModelPerformanceMetricRepository(PerformanceMetricRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -136,11 +191,32 @@ class SQLModelPerformanceMetricRepository(PerformanceMetricRepository):
         )
         self.db.add(db_metric)
         self.db.commit()
-        self.db.refresh(db_metric)
         return metric
 
-    def get_all(self, crew_id: UUID) -> List[PerformanceMetric]:
-        return self.db.exec(select(MetricModel).where(MetricModel.crew_id == str(crew_id))).all()
+    def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        rows = [
+            dict(
+                metric_id=str(metric.metric_id), crew_id=str(metric.crew_id), date=metric.date,
+                productivity=metric.productivity, tasks_completed=metric.tasks_completed,
+                tasks_total=metric.tasks_total, hours_worked=metric.hours_worked
+            )
+            for metric in metrics
+        ]
+        if rows:
+            self.db.exec(insert(MetricModel), params=rows)
+            self.db.commit()
+        return metrics
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        return self.db.exec(page(select(MetricModel).where(MetricModel.crew_id == str(crew_id)), MetricModel.metric_id, limit, after)).all()
+
+    def iter_all(self, crew_id: UUID) -> Iterator[PerformanceMetric]:
+        # Runs on its own session: a streaming response outlives the request's.
+        # Rows are dumped through the API model, like the GET response's items.
+        with Session(self.db.get_bind()) as session:
+            query = select(MetricModel).where(MetricModel.crew_id == str(crew_id)).execution_options(yield_per=STREAM_BATCH_SIZE)
+            for row in session.exec(query):
+                yield PerformanceMetric.model_validate(row, from_attributes=True)
 
     def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
         metric = self.db.exec(select(MetricModel).where(MetricModel.metric_id == str(metric_id))).first()
@@ -149,27 +225,25 @@ class SQLModelPerformanceMetricRepository(PerformanceMetricRepository):
         return metric
 
     def update(self, metric_id: UUID, updated_metric: PerformanceMetric) -> PerformanceMetric:
-        metric = self.db.exec(select(MetricModel).where(MetricModel.metric_id == str(metric_id))).first()
-        if not metric:
+        statement = update(MetricModel).where(MetricModel.metric_id == str(metric_id)).values(
+            metric_id=str(updated_metric.metric_id), crew_id=str(updated_metric.crew_id),
+            date=updated_metric.date, productivity=updated_metric.productivity,
+            tasks_completed=updated_metric.tasks_completed, tasks_total=updated_metric.tasks_total,
+            hours_worked=updated_metric.hours_worked
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Metric not found")
-        metric.metric_id = str(updated_metric.metric_id)
-        metric.crew_id = str(updated_metric.crew_id)
-        metric.date = updated_metric.date
-        metric.productivity = updated_metric.productivity
-        metric.tasks_completed = updated_metric.tasks_completed
-        metric.tasks_total = updated_metric.tasks_total
-        metric.hours_worked = updated_metric.hours_worked
         self.db.commit()
-        self.db.refresh(metric)
         return updated_metric
 
     def delete(self, metric_id: UUID) -> None:
-        metric = self.db.exec(select(MetricModel).where(MetricModel.metric_id == str(metric_id))).first()
-        if not metric:
+        if self.db.exec(delete(MetricModel).where(MetricModel.metric_id == str(metric_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Metric not found")
-        self.db.delete(metric)
         self.db.commit()
 
+    def version(self, crew_id: UUID = None) -> str:
+        return table_version(self.db, "performancemetric")
+
 class SQLModelActivityRepository(ActivityRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -182,11 +256,24 @@ class SQLModelActivityRepository(ActivityRepository):
         )
         self.db.add(db_activity)
         self.db.commit()
-        self.db.refresh(db_activity)
         return activity
 
-    def get_all(self, project_id: UUID) -> List[Activity]:
-        return self.db.exec(select(ActivityModel).where(ActivityModel.project_id == str(project_id))).all()
+    def create_many(self, activities: List[Activity]) -> List[Activity]:
+        rows = [
+            dict(
+                activity_id=str(activity.activity_id), project_id=str(activity.project_id),
+                description=activity.description, constraint=activity.constraint,
+                start_date=activity.start_date, end_date=activity.end_date
+            )
+            for activity in activities
+        ]
+        if rows:
+            self.db.exec(insert(ActivityModel), params=rows)
+            self.db.commit()
+        return activities
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Activity]:
+        return self.db.exec(page(select(ActivityModel).where(ActivityModel.project_id == str(project_id)), ActivityModel.activity_id, limit, after)).all()
 
     def get_by_id(self, activity_id: UUID) -> Activity:
         activity = self.db.exec(select(ActivityModel).where(ActivityModel.activity_id == str(activity_id))).first()
@@ -195,26 +282,25 @@ class SQLModelActivityRepository(ActivityRepository):
         return activity
 
     def update(self, activity_id: UUID, updated_activity: Activity) -> Activity:
-        activity = self.db.exec(select(ActivityModel).where(ActivityModel.activity_id == str(activity_id))).first()
-        if not activity:
+        statement = update(ActivityModel).where(ActivityModel.activity_id == str(activity_id)).values(
+            activity_id=str(updated_activity.activity_id),
+            project_id=str(updated_activity.project_id), description=updated_activity.description,
+            constraint=updated_activity.constraint, start_date=updated_activity.start_date,
+            end_date=updated_activity.end_date
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Activity not found")
-        activity.activity_id = str(updated_activity.activity_id)
-        activity.project_id = str(updated_activity.project_id)
-        activity.description = updated_activity.description
-        activity.constraint = updated_activity.constraint
-        activity.start_date = updated_activity.start_date
-        activity.end_date = updated_activity.end_date
         self.db.commit()
-        self.db.refresh(activity)
         return updated_activity
 
     def delete(self, activity_id: UUID) -> None:
-        activity = self.db.exec(select(ActivityModel).where(ActivityModel.activity_id == str(activity_id))).first()
-        if not activity:
+        if self.db.exec(delete(ActivityModel).where(ActivityModel.activity_id == str(activity_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Activity not found")
-        self.db.delete(activity)
         self.db.commit()
 
+    def version(self, project_id: UUID = None) -> str:
+        return table_version(self.db, "activity")
+
 class SQLModelShipmentRepository(ShipmentRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -228,11 +314,25 @@ class SQLModelShipmentRepository(ShipmentRepository):
         )
         self.db.add(db_shipment)
         self.db.commit()
-        self.db.refresh(db_shipment)
         return shipment
 
-    def get_all(self, project_id: UUID) -> List[Shipment]:
-        return self.db.exec(select(ShipmentModel).where(ShipmentModel.project_id == str(project_id))).all()
+    def create_many(self, shipments: List[Shipment]) -> List[Shipment]:
+        rows = [
+            dict(
+                shipment_id=str(shipment.shipment_id), project_id=str(shipment.project_id),
+                location=shipment.location, contents=shipment.contents, status=shipment.status.value,
+                arrival_date=shipment.arrival_date, customs_date=shipment.customs_date,
+                laydown_date=shipment.laydown_date, available_date=shipment.available_date
+            )
+            for shipment in shipments
+        ]
+        if rows:
+            self.db.exec(insert(ShipmentModel), params=rows)
+            self.db.commit()
+        return shipments
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Shipment]:
+        return self.db.exec(page(select(ShipmentModel).where(ShipmentModel.project_id == str(project_id)), ShipmentModel.shipment_id, limit, after)).all()
 
     def get_by_id(self, shipment_id: UUID) -> Shipment:
         shipment = self.db.exec(select(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id))).first()
@@ -241,29 +341,27 @@ class SQLModelShipmentRepository(ShipmentRepository):
         return shipment
 
     def update(self, shipment_id: UUID, updated_shipment: Shipment) -> Shipment:
-        shipment = self.db.exec(select(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id))).first()
-        if not shipment:
+        statement = update(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id)).values(
+            shipment_id=str(updated_shipment.shipment_id),
+            project_id=str(updated_shipment.project_id), location=updated_shipment.location,
+            contents=updated_shipment.contents, status=updated_shipment.status.value,
+            arrival_date=updated_shipment.arrival_date, customs_date=updated_shipment.customs_date,
+            laydown_date=updated_shipment.laydown_date,
+            available_date=updated_shipment.available_date
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Shipment not found")
-        shipment.shipment_id = str(updated_shipment.shipment_id)
-        shipment.project_id = str(updated_shipment.project_id)
-        shipment.location = updated_shipment.location
-        shipment.contents = updated_shipment.contents
-        shipment.status = updated_shipment.status.value
-        shipment.arrival_date = updated_shipment.arrival_date
-        shipment.customs_date = updated_shipment.customs_date
-        shipment.laydown_date = updated_shipment.laydown_date
-        shipment.available_date = updated_shipment.available_date
         self.db.commit()
-        self.db.refresh(shipment)
         return updated_shipment
 
     def delete(self, shipment_id: UUID) -> None:
-        shipment = self.db.exec(select(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id))).first()
-        if not shipment:
+        if self.db.exec(delete(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Shipment not found")
-        self.db.delete(shipment)
         self.db.commit()
 
+    def version(self, project_id: UUID = None) -> str:
+        return table_version(self.db, "shipment")
+
 class SQLModelScheduleStatusRepository(ScheduleStatusRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -275,11 +373,23 @@ class SQLModelScheduleStatusRepository(ScheduleStatusRepository):
         )
         self.db.add(db_status)
         self.db.commit()
-        self.db.refresh(db_status)
         return status
 
-    def get_all(self, project_id: UUID) -> List[ScheduleStatus]:
-        return self.db.exec(select(StatusModel).where(StatusModel.project_id == str(project_id))).all()
+    def create_many(self, statuses: List[ScheduleStatus]) -> List[ScheduleStatus]:
+        rows = [
+            dict(
+                status_id=str(status.status_id), project_id=str(status.project_id),
+                phase=status.phase, status=status.status.value, last_updated=status.last_updated
+            )
+            for status in statuses
+        ]
+        if rows:
+            self.db.exec(insert(StatusModel), params=rows)
+            self.db.commit()
+        return statuses
+
+    def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[ScheduleStatus]:
+        return self.db.exec(page(select(StatusModel).where(StatusModel.project_id == str(project_id)), StatusModel.status_id, limit, after)).all()
 
     def get_by_id(self, status_id: UUID) -> ScheduleStatus:
         status = self.db.exec(select(StatusModel).where(StatusModel.status_id == str(status_id))).first()
@@ -288,33 +398,33 @@ class SQLModelScheduleStatusRepository(ScheduleStatusRepository):
         return status
 
     def update(self, status_id: UUID, updated_status: ScheduleStatus) -> ScheduleStatus:
-        status = self.db.exec(select(StatusModel).where(StatusModel.status_id == str(status_id))).first()
-        if not status:
+        statement = update(StatusModel).where(StatusModel.status_id == str(status_id)).values(
+            status_id=str(updated_status.status_id), project_id=str(updated_status.project_id),
+            phase=updated_status.phase, status=updated_status.status.value,
+            last_updated=updated_status.last_updated
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Status not found")
-        status.status_id = str(updated_status.status_id)
-        status.project_id = str(updated_status.project_id)
-        status.phase = updated_status.phase
-        status.status = updated_status.status.value
-        status.last_updated = updated_status.last_updated
         self.db.commit()
-        self.db.refresh(status)
         return updated_status
 
     def delete(self, status_id: UUID) -> None:
-        status = self.db.exec(select(StatusModel).where(StatusModel.status_id == str(status_id))).first()
-        if not status:
+        if self.db.exec(delete(StatusModel).where(StatusModel.status_id == str(status_id))).rowcount == 0:
             raise HTTPException(status_code=404, detail="Status not found")
-        self.db.delete(status)
         self.db.commit()
 
+    def version(self, project_id: UUID = None) -> str:
+        return table_version(self.db, "schedulestatus")
+
 class SQLModelTimeReportRepository(TimeReportRepository):
     def __init__(self, db: Session):
         self.db = db
 
+    def load_role(self, user_id: str):
+        return self.db.exec(select(UserModel.role).where(UserModel.user_id == user_id)).first()
+
     def create(self, report: TimeReport, user_id: UUID) -> TimeReport:
-        user = self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id))).first()
-        if not user or user.role != Role.FOREMAN.value:
-            raise HTTPException(status_code=403, detail="Only Foremen can submit time reports")
+        check_foreman(user_id, self.load_role, "submit")
         db_report = ReportModel(
             report_id=str(report.report_id), crew_id=str(report.crew_id), user_id=str(report.user_id),
             date=report.date, member_name=report.member_name, task=report.task,
@@ -322,11 +432,33 @@ class SQLModelTimeReportRepository(TimeReportRepository):
         )
         self.db.add(db_report)
         self.db.commit()
-        self.db.refresh(db_report)
         return report
 
-    def get_all(self, crew_id: UUID) -> List[TimeReport]:
-        return self.db.exec(select(ReportModel).where(ReportModel.crew_id == str(crew_id))).all()
+    def create_many(self, reports: List[TimeReport], user_id: UUID) -> List[TimeReport]:
+        check_foreman(user_id, self.load_role, "submit")
+        rows = [
+            dict(
+                report_id=str(report.report_id), crew_id=str(report.crew_id), user_id=str(report.user_id),
+                date=report.date, member_name=report.member_name, task=report.task,
+                hours=report.hours, effort_percentage=report.effort_percentage
+            )
+            for report in reports
+        ]
+        if rows:
+            self.db.exec(insert(ReportModel), params=rows)
+            self.db.commit()
+        return reports
+
+    def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[TimeReport]:
+        return self.db.exec(page(select(ReportModel).where(ReportModel.crew_id == str(crew_id)), ReportModel.report_id, limit, after)).all()
+
+    def iter_all(self, crew_id: UUID) -> Iterator[TimeReport]:
+        # Runs on its own session: a streaming response outlives the request's.
+        # Rows are dumped through the API model, like the GET response's items.
+        with Session(self.db.get_bind()) as session:
+            query = select(ReportModel).where(ReportModel.crew_id == str(crew_id)).execution_options(yield_per=STREAM_BATCH_SIZE)
+            for row in session.exec(query):
+                yield TimeReport.model_validate(row, from_attributes=True)
 
     def get_by_id(self, report_id: UUID) -> TimeReport:
         report = self.db.exec(select(ReportModel).where(ReportModel.report_id == str(report_id))).first()
@@ -335,27 +467,493 @@ class SQLModelTimeReportRepository(TimeReportRepository):
         return report
 
     def update(self, report_id: UUID, updated_report: TimeReport, user_id: UUID) -> TimeReport:
-        report = self.db.exec(select(ReportModel).where(ReportModel.report_id == str(report_id))).first()
-        if not report:
+        try:
+            check_foreman(user_id, self.load_role, "update")
+        except HTTPException:
+            # A missing report is a 404 whoever asks.
+            if not self.db.exec(select(ReportModel.report_id).where(ReportModel.report_id == str(report_id))).first():
+                raise HTTPException(status_code=404, detail="Report not found")
+            raise
+        statement = update(ReportModel).where(ReportModel.report_id == str(report_id)).values(
+            report_id=str(updated_report.report_id), crew_id=str(updated_report.crew_id),
+            user_id=str(updated_report.user_id), date=updated_report.date,
+            member_name=updated_report.member_name, task=updated_report.task,
+            hours=updated_report.hours, effort_percentage=updated_report.effort_percentage
+        )
+        if self.db.exec(statement).rowcount == 0:
             raise HTTPException(status_code=404, detail="Report not found")
-        user = self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id))).first()
-        if not user or user.role != Role.FOREMAN.value:
-            raise HTTPException(status_code=403, detail="Only Foremen can update time reports")
-        report.report_id = str(updated_report.report_id)
-        report.crew_id = str(updated_report.crew_id)
-        report.user_id = str(updated_report.user_id)
-        report.date = updated_report.date
-        report.member_name = updated_report.member_name
-        report.task = updated_report.task
-        report.hours = updated_report.hours
-        report.effort_percentage = updated_report.effort_percentage
         self.db.commit()
-        self.db.refresh(report)
         return updated_report
 
     def delete(self, report_id: UUID) -> None:
-        report = self.db.exec(select(ReportModel).where(ReportModel.report_id == str(report_id))).first()
+        if self.db.exec(delete(ReportModel).where(ReportModel.report_id == str(report_id))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Report not found")
+        self.db.commit()
+
+    def version(self, crew_id: UUID = None) -> str:
+        return table_version(self.db, "timereport")
+
+# Async variants on AsyncSession (aiosqlite), so async endpoints await the
+# database instead of blocking the event loop.
+
+class AsyncSQLModelUserRepository(UserRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, user: User) -> User:
+        db_user = UserModel(user_id=str(user.user_id), username=user.username, role=user.role.value)
+        self.db.add(db_user)
+        await self.db.commit()
+        roles.invalidate(user.user_id)
+        return user
+
+    async def create_many(self, users: List[User]) -> List[User]:
+        rows = [
+            dict(user_id=str(user.user_id), username=user.username, role=user.role.value)
+            for user in users
+        ]
+        if rows:
+            await self.db.exec(insert(UserModel), params=rows)
+            await self.db.commit()
+        roles.invalidate(*(user.user_id for user in users))
+        return users
+
+    async def get_all(self, limit: int = None, after: UUID = None) -> List[User]:
+        return (await self.db.exec(page(select(UserModel), UserModel.user_id, limit, after))).all()
+
+    async def get_by_id(self, user_id: UUID) -> User:
+        user = (await self.db.exec(select(UserModel).where(UserModel.user_id == str(user_id)))).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
+    async def update(self, user_id: UUID, updated_user: User) -> User:
+        statement = update(UserModel).where(UserModel.user_id == str(user_id)).values(
+            user_id=str(updated_user.user_id), username=updated_user.username,
+            role=updated_user.role.value
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="User not found")
+        await self.db.commit()
+        roles.invalidate(user_id, updated_user.user_id)
+        return updated_user
+
+    async def delete(self, user_id: UUID) -> None:
+        if (await self.db.exec(delete(UserModel).where(UserModel.user_id == str(user_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="User not found")
+        await self.db.commit()
+        roles.invalidate(user_id)
+
+    async def version(self) -> str:
+        return await async_table_version(self.db, "user")
+
+class AsyncSQLModelCrewRepository(CrewRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, crew: Crew) -> Crew:
+        db_crew = CrewModel(crew_id=str(crew.crew_id), name=crew.name, project_id=str(crew.project_id))
+        self.db.add(db_crew)
+        await self.db.commit()
+        return crew
+
+    async def create_many(self, crews: List[Crew]) -> List[Crew]:
+        rows = [
+            dict(crew_id=str(crew.crew_id), name=crew.name, project_id=str(crew.project_id))
+            for crew in crews
+        ]
+        if rows:
+            await self.db.exec(insert(CrewModel), params=rows)
+            await self.db.commit()
+        return crews
+
+    async def get_all(self, project_id: UUID = None, limit: int = None, after: UUID = None) -> List[Crew]:
+        query = select(CrewModel)
+        if project_id:
+            query = query.where(CrewModel.project_id == str(project_id))
+        return (await self.db.exec(page(query, CrewModel.crew_id, limit, after))).all()
+
+    async def get_by_id(self, crew_id: UUID) -> Crew:
+        crew = (await self.db.exec(select(CrewModel).where(CrewModel.crew_id == str(crew_id)))).first()
+        if not crew:
+            raise HTTPException(status_code=404, detail="Crew not found")
+        return crew
+
+    async def update(self, crew_id: UUID, updated_crew: Crew) -> Crew:
+        statement = update(CrewModel).where(CrewModel.crew_id == str(crew_id)).values(
+            crew_id=str(updated_crew.crew_id), name=updated_crew.name,
+            project_id=str(updated_crew.project_id)
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Crew not found")
+        await self.db.commit()
+        return updated_crew
+
+    async def delete(self, crew_id: UUID) -> None:
+        if (await self.db.exec(delete(CrewModel).where(CrewModel.crew_id == str(crew_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Crew not found")
+        await self.db.commit()
+
+    async def version(self, project_id: UUID = None) -> str:
+        return await async_table_version(self.db, "crew")
+
+class AsyncSQLModelProjectRepository(ProjectRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, project: Project) -> Project:
+        db_project = ProjectModel(project_id=str(project.project_id), name=project.name, start_date=project.start_date, end_date=project.end_date)
+        self.db.add(db_project)
+        await self.db.commit()
+        return project
+
+    async def create_many(self, projects: List[Project]) -> List[Project]:
+        rows = [
+            dict(project_id=str(project.project_id), name=project.name, start_date=project.start_date, end_date=project.end_date)
+            for project in projects
+        ]
+        if rows:
+            await self.db.exec(insert(ProjectModel), params=rows)
+            await self.db.commit()
+        return projects
+
+    async def get_all(self, limit: int = None, after: UUID = None) -> List[Project]:
+        return (await self.db.exec(page(select(ProjectModel), ProjectModel.project_id, limit, after))).all()
+
+    async def get_by_id(self, project_id: UUID) -> Project:
+        project = (await self.db.exec(select(ProjectModel).where(ProjectModel.project_id == str(project_id)))).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return project
+
+    async def update(self, project_id: UUID, updated_project: Project) -> Project:
+        statement = update(ProjectModel).where(ProjectModel.project_id == str(project_id)).values(
+            project_id=str(updated_project.project_id), name=updated_project.name,
+            start_date=updated_project.start_date, end_date=updated_project.end_date
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Project not found")
+        await self.db.commit()
+        return updated_project
+
+    async def delete(self, project_id: UUID) -> None:
+        if (await self.db.exec(delete(ProjectModel).where(ProjectModel.project_id == str(project_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Project not found")
+        await self.db.commit()
+
+    async def version(self) -> str:
+        return await async_table_version(self.db, "project")
+
+class AsyncSQLModelPerformanceMetricRepository(PerformanceMetricRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, metric: PerformanceMetric) -> PerformanceMetric:
+        db_metric = MetricModel(
+            metric_id=str(metric.metric_id), crew_id=str(metric.crew_id), date=metric.date,
+            productivity=metric.productivity, tasks_completed=metric.tasks_completed,
+            tasks_total=metric.tasks_total, hours_worked=metric.hours_worked
+        )
+        self.db.add(db_metric)
+        await self.db.commit()
+        return metric
+
+    async def create_many(self, metrics: List[PerformanceMetric]) -> List[PerformanceMetric]:
+        rows = [
+            dict(
+                metric_id=str(metric.metric_id), crew_id=str(metric.crew_id), date=metric.date,
+                productivity=metric.productivity, tasks_completed=metric.tasks_completed,
+                tasks_total=metric.tasks_total, hours_worked=metric.hours_worked
+            )
+            for metric in metrics
+        ]
+        if rows:
+            await self.db.exec(insert(MetricModel), params=rows)
+            await self.db.commit()
+        return metrics
+
+    async def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[PerformanceMetric]:
+        return (await self.db.exec(page(select(MetricModel).where(MetricModel.crew_id == str(crew_id)), MetricModel.metric_id, limit, after))).all()
+
+    async def iter_all(self, crew_id: UUID) -> AsyncIterator[PerformanceMetric]:
+        # Runs on its own session: a streaming response outlives the request's.
+        # Rows are dumped through the API model, like the GET response's items.
+        async with AsyncSession(self.db.bind) as session:
+            query = select(MetricModel).where(MetricModel.crew_id == str(crew_id)).execution_options(yield_per=STREAM_BATCH_SIZE)
+            async for row in await session.stream_scalars(query):
+                yield PerformanceMetric.model_validate(row, from_attributes=True)
+
+    async def get_by_id(self, metric_id: UUID) -> PerformanceMetric:
+        metric = (await self.db.exec(select(MetricModel).where(MetricModel.metric_id == str(metric_id)))).first()
+        if not metric:
+            raise HTTPException(status_code=404, detail="Metric not found")
+        return metric
+
+    async def update(self, metric_id: UUID, updated_metric: PerformanceMetric) -> PerformanceMetric:
+        statement = update(MetricModel).where(MetricModel.metric_id == str(metric_id)).values(
+            metric_id=str(updated_metric.metric_id), crew_id=str(updated_metric.crew_id),
+            date=updated_metric.date, productivity=updated_metric.productivity,
+            tasks_completed=updated_metric.tasks_completed, tasks_total=updated_metric.tasks_total,
+            hours_worked=updated_metric.hours_worked
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Metric not found")
+        await self.db.commit()
+        return updated_metric
+
+    async def delete(self, metric_id: UUID) -> None:
+        if (await self.db.exec(delete(MetricModel).where(MetricModel.metric_id == str(metric_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Metric not found")
+        await self.db.commit()
+
+    async def version(self, crew_id: UUID = None) -> str:
+        return await async_table_version(self.db, "performancemetric")
+
+class AsyncSQLModelActivityRepository(ActivityRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, activity: Activity) -> Activity:
+        db_activity = ActivityModel(
+            activity_id=str(activity.activity_id), project_id=str(activity.project_id),
+            description=activity.description, constraint=activity.constraint,
+            start_date=activity.start_date, end_date=activity.end_date
+        )
+        self.db.add(db_activity)
+        await self.db.commit()
+        return activity
+
+    async def create_many(self, activities: List[Activity]) -> List[Activity]:
+        rows = [
+            dict(
+                activity_id=str(activity.activity_id), project_id=str(activity.project_id),
+                description=activity.description, constraint=activity.constraint,
+                start_date=activity.start_date, end_date=activity.end_date
+            )
+            for activity in activities
+        ]
+        if rows:
+            await self.db.exec(insert(ActivityModel), params=rows)
+            await self.db.commit()
+        return activities
+
+    async def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Activity]:
+        return (await self.db.exec(page(select(ActivityModel).where(ActivityModel.project_id == str(project_id)), ActivityModel.activity_id, limit, after))).all()
+
+    async def get_by_id(self, activity_id: UUID) -> Activity:
+        activity = (await self.db.exec(select(ActivityModel).where(ActivityModel.activity_id == str(activity_id)))).first()
+        if not activity:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return activity
+
+    async def update(self, activity_id: UUID, updated_activity: Activity) -> Activity:
+        statement = update(ActivityModel).where(ActivityModel.activity_id == str(activity_id)).values(
+            activity_id=str(updated_activity.activity_id),
+            project_id=str(updated_activity.project_id), description=updated_activity.description,
+            constraint=updated_activity.constraint, start_date=updated_activity.start_date,
+            end_date=updated_activity.end_date
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        await self.db.commit()
+        return updated_activity
+
+    async def delete(self, activity_id: UUID) -> None:
+        if (await self.db.exec(delete(ActivityModel).where(ActivityModel.activity_id == str(activity_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        await self.db.commit()
+
+    async def version(self, project_id: UUID = None) -> str:
+        return await async_table_version(self.db, "activity")
+
+class AsyncSQLModelShipmentRepository(ShipmentRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, shipment: Shipment) -> Shipment:
+        db_shipment = ShipmentModel(
+            shipment_id=str(shipment.shipment_id), project_id=str(shipment.project_id),
+            location=shipment.location, contents=shipment.contents, status=shipment.status.value,
+            arrival_date=shipment.arrival_date, customs_date=shipment.customs_date,
+            laydown_date=shipment.laydown_date, available_date=shipment.available_date
+        )
+        self.db.add(db_shipment)
+        await self.db.commit()
+        return shipment
+
+    async def create_many(self, shipments: List[Shipment]) -> List[Shipment]:
+        rows = [
+            dict(
+                shipment_id=str(shipment.shipment_id), project_id=str(shipment.project_id),
+                location=shipment.location, contents=shipment.contents, status=shipment.status.value,
+                arrival_date=shipment.arrival_date, customs_date=shipment.customs_date,
+                laydown_date=shipment.laydown_date, available_date=shipment.available_date
+            )
+            for shipment in shipments
+        ]
+        if rows:
+            await self.db.exec(insert(ShipmentModel), params=rows)
+            await self.db.commit()
+        return shipments
+
+    async def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[Shipment]:
+        return (await self.db.exec(page(select(ShipmentModel).where(ShipmentModel.project_id == str(project_id)), ShipmentModel.shipment_id, limit, after))).all()
+
+    async def get_by_id(self, shipment_id: UUID) -> Shipment:
+        shipment = (await self.db.exec(select(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id)))).first()
+        if not shipment:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        return shipment
+
+    async def update(self, shipment_id: UUID, updated_shipment: Shipment) -> Shipment:
+        statement = update(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id)).values(
+            shipment_id=str(updated_shipment.shipment_id),
+            project_id=str(updated_shipment.project_id), location=updated_shipment.location,
+            contents=updated_shipment.contents, status=updated_shipment.status.value,
+            arrival_date=updated_shipment.arrival_date, customs_date=updated_shipment.customs_date,
+            laydown_date=updated_shipment.laydown_date,
+            available_date=updated_shipment.available_date
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        await self.db.commit()
+        return updated_shipment
+
+    async def delete(self, shipment_id: UUID) -> None:
+        if (await self.db.exec(delete(ShipmentModel).where(ShipmentModel.shipment_id == str(shipment_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        await self.db.commit()
+
+    async def version(self, project_id: UUID = None) -> str:
+        return await async_table_version(self.db, "shipment")
+
+class AsyncSQLModelScheduleStatusRepository(ScheduleStatusRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, status: ScheduleStatus) -> ScheduleStatus:
+        db_status = StatusModel(
+            status_id=str(status.status_id), project_id=str(status.project_id),
+            phase=status.phase, status=status.status.value, last_updated=status.last_updated
+        )
+        self.db.add(db_status)
+        await self.db.commit()
+        return status
+
+    async def create_many(self, statuses: List[ScheduleStatus]) -> List[ScheduleStatus]:
+        rows = [
+            dict(
+                status_id=str(status.status_id), project_id=str(status.project_id),
+                phase=status.phase, status=status.status.value, last_updated=status.last_updated
+            )
+            for status in statuses
+        ]
+        if rows:
+            await self.db.exec(insert(StatusModel), params=rows)
+            await self.db.commit()
+        return statuses
+
+    async def get_all(self, project_id: UUID, limit: int = None, after: UUID = None) -> List[ScheduleStatus]:
+        return (await self.db.exec(page(select(StatusModel).where(StatusModel.project_id == str(project_id)), StatusModel.status_id, limit, after))).all()
+
+    async def get_by_id(self, status_id: UUID) -> ScheduleStatus:
+        status = (await self.db.exec(select(StatusModel).where(StatusModel.status_id == str(status_id)))).first()
+        if not status:
+            raise HTTPException(status_code=404, detail="Status not found")
+        return status
+
+    async def update(self, status_id: UUID, updated_status: ScheduleStatus) -> ScheduleStatus:
+        statement = update(StatusModel).where(StatusModel.status_id == str(status_id)).values(
+            status_id=str(updated_status.status_id), project_id=str(updated_status.project_id),
+            phase=updated_status.phase, status=updated_status.status.value,
+            last_updated=updated_status.last_updated
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Status not found")
+        await self.db.commit()
+        return updated_status
+
+    async def delete(self, status_id: UUID) -> None:
+        if (await self.db.exec(delete(StatusModel).where(StatusModel.status_id == str(status_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Status not found")
+        await self.db.commit()
+
+    async def version(self, project_id: UUID = None) -> str:
+        return await async_table_version(self.db, "schedulestatus")
+
+class AsyncSQLModelTimeReportRepository(TimeReportRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_role(self, user_id: str):
+        return (await self.db.exec(select(UserModel.role).where(UserModel.user_id == user_id))).first()
+
+    async def create(self, report: TimeReport, user_id: UUID) -> TimeReport:
+        await check_foreman_async(user_id, self.load_role, "submit")
+        db_report = ReportModel(
+            report_id=str(report.report_id), crew_id=str(report.crew_id), user_id=str(report.user_id),
+            date=report.date, member_name=report.member_name, task=report.task,
+            hours=report.hours, effort_percentage=report.effort_percentage
+        )
+        self.db.add(db_report)
+        await self.db.commit()
+        return report
+
+    async def create_many(self, reports: List[TimeReport], user_id: UUID) -> List[TimeReport]:
+        await check_foreman_async(user_id, self.load_role, "submit")
+        rows = [
+            dict(
+                report_id=str(report.report_id), crew_id=str(report.crew_id), user_id=str(report.user_id),
+                date=report.date, member_name=report.member_name, task=report.task,
+                hours=report.hours, effort_percentage=report.effort_percentage
+            )
+            for report in reports
+        ]
+        if rows:
+            await self.db.exec(insert(ReportModel), params=rows)
+            await self.db.commit()
+        return reports
+
+    async def get_all(self, crew_id: UUID, limit: int = None, after: UUID = None) -> List[TimeReport]:
+        return (await self.db.exec(page(select(ReportModel).where(ReportModel.crew_id == str(crew_id)), ReportModel.report_id, limit, after))).all()
+
+    async def iter_all(self, crew_id: UUID) -> AsyncIterator[TimeReport]:
+        # Runs on its own session: a streaming response outlives the request's.
+        # Rows are dumped through the API model, like the GET response's items.
+        async with AsyncSession(self.db.bind) as session:
+            query = select(ReportModel).where(ReportModel.crew_id == str(crew_id)).execution_options(yield_per=STREAM_BATCH_SIZE)
+            async for row in await session.stream_scalars(query):
+                yield TimeReport.model_validate(row, from_attributes=True)
+
+    async def get_by_id(self, report_id: UUID) -> TimeReport:
+        report = (await self.db.exec(select(ReportModel).where(ReportModel.report_id == str(report_id)))).first()
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
-        self.db.delete(report)
-        self.db.commit()
\ No newline at end of file
+        return report
+
+    async def update(self, report_id: UUID, updated_report: TimeReport, user_id: UUID) -> TimeReport:
+        try:
+            await check_foreman_async(user_id, self.load_role, "update")
+        except HTTPException:
+            # A missing report is a 404 whoever asks.
+            if not (await self.db.exec(select(ReportModel.report_id).where(ReportModel.report_id == str(report_id)))).first():
+                raise HTTPException(status_code=404, detail="Report not found")
+            raise
+        statement = update(ReportModel).where(ReportModel.report_id == str(report_id)).values(
+            report_id=str(updated_report.report_id), crew_id=str(updated_report.crew_id),
+            user_id=str(updated_report.user_id), date=updated_report.date,
+            member_name=updated_report.member_name, task=updated_report.task,
+            hours=updated_report.hours, effort_percentage=updated_report.effort_percentage
+        )
+        if (await self.db.exec(statement)).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Report not found")
+        await self.db.commit()
+        return updated_report
+
+    async def delete(self, report_id: UUID) -> None:
+        if (await self.db.exec(delete(ReportModel).where(ReportModel.report_id == str(report_id)))).rowcount == 0:
+            raise HTTPException(status_code=404, detail="Report not found")
+        await self.db.commit()
+
+    async def version(self, crew_id: UUID = None) -> str:
+        return await async_table_version(self.db, "timereport")
\ No newline at end of file
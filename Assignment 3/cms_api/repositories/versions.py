@@ -0,0 +1,40 @@
+import hashlib
+import os
+import threading
+
+# Versions behind the ETags of GET routes. SQL keeps a counter per table in
+# the tableversion table; CSV and Parquet derive theirs from the files
+# themselves (see signature_tag), so writes by other workers, scripts and
+# hand edits all change them.
+
+def signature_tag(signature) -> str:
+    # A short, process-independent tag for a file signature (mtimes and
+    # sizes, part names): equal signatures give equal tags in every worker.
+    return hashlib.blake2b(repr(signature).encode(), digest_size=8).hexdigest()
+
+# Write counters for the backends whose data only this process writes while
+# it runs (MEM, and MMAP's metric store). Each table has a counter bumped by
+# every write, plus one per partition (the project or crew a listing filters
+# on) bumped by creates into it. Updates and deletes do not know the row's
+# old partition, so they bump the table's "*" counter, which is part of every
+# partition's tag.
+class TableVersions:
+    def __init__(self):
+        # Counters restart with the process; the epoch keeps an ETag from an
+        # earlier run from matching a new one.
+        self.epoch = os.urandom(4).hex()
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def bump(self, table: str, *partitions) -> None:
+        keys = [table] + [(table, str(partition)) for partition in partitions or ("*",)]
+        with self.lock:
+            for key in keys:
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def tag(self, table: str, partition=None) -> str:
+        if partition is None:
+            return f"{self.epoch}-{self.counts.get(table, 0)}"
+        return f"{self.epoch}-{self.counts.get((table, '*'), 0)}-{self.counts.get((table, str(partition)), 0)}"
+
+versions = TableVersions()
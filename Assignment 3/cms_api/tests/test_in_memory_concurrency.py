@@ -0,0 +1,41 @@
+import sys
+import threading
+import unittest
+from models import Role, User
+import repositories.memory_storage as memory_storage
+from repositories.in_memory_repo import InMemoryUserRepository
+from benchmarks.stress_in_memory import FOREMAN, TABLES, check_contents, worker
+
+# A bounded run of benchmarks/stress_in_memory.py: a few threads hammer the
+# shared in-memory tables, then every table must hold exactly the rows the
+# threads believe are live. Run from cms_api/: python -m unittest
+THREADS = 8
+OPERATIONS = 1000
+
+class InMemoryConcurrencyTests(unittest.TestCase):
+    def setUp(self):
+        # Switch threads as often as possible and compact early, as the
+        # benchmark does, so the interleavings that matter happen quickly.
+        self.switch_interval = sys.getswitchinterval()
+        self.compact_min_rows = memory_storage.COMPACT_MIN_ROWS
+        sys.setswitchinterval(1e-5)
+        memory_storage.COMPACT_MIN_ROWS = 64
+        InMemoryUserRepository().create(User(user_id=FOREMAN, username="stress", role=Role.FOREMAN))
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+        memory_storage.COMPACT_MIN_ROWS = self.compact_min_rows
+
+    def test_concurrent_writes_and_reads(self):
+        owned = [[{} for _ in TABLES] for _ in range(THREADS)]
+        errors = []
+        threads = [threading.Thread(target=worker, args=(OPERATIONS, owned[t], errors)) for t in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        check_contents(owned, errors)
+        self.assertEqual([], [f"{type(e).__name__}: {e}" for e in errors])
+
+if __name__ == "__main__":
+    unittest.main()